@@ -0,0 +1,77 @@
+import numpy as np
+
+# Helpers for the uniform grids of PolygonIndex (lab 5) and SegmentSet (lab 6),
+# which list every segment in the grid cells it passes through.
+
+
+def expand(first, last):
+    """
+    Expand the ranges first[i]..last[i] (inclusive).
+
+    Returns (owner, value): for every value of every range, the index i of
+    its range and the value itself
+    """
+    counts = last - first + 1
+    owner = np.repeat(np.arange(len(first)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, first[owner] + offsets
+
+
+def within(ax, ay, bx, by, px, py):
+    """True where p, known to be collinear with a and b, lies on the segment ab."""
+    return ((np.minimum(ax, bx) <= px) & (px <= np.maximum(ax, bx)) &
+            (np.minimum(ay, by) <= py) & (py <= np.maximum(ay, by)))
+
+
+def cell_range(low, high, origin, cell_size, count, slack=1e-9):
+    """
+    Indices of the grid cells along one axis that cover [low, high].
+
+    Parameters:
+    low, high: Interval ends, arrays of the same shape
+    origin (float): Start of the grid along the axis
+    cell_size (float): Cell size along the axis
+    count (int): Number of cells along the axis
+    slack (float): Widening of the interval, in cells, against rounding
+
+    Returns (first, last), int arrays clipped to the grid
+    """
+    first = np.floor((low - origin) / cell_size - slack)
+    final = np.floor((high - origin) / cell_size + slack)
+    return (np.clip(first, 0, count - 1).astype(np.intp),
+            np.clip(final, 0, count - 1).astype(np.intp))
+
+
+def segment_cells(x1, y1, x2, y2, origin, cell_size, shape):
+    """
+    The grid cells every segment (x1, y1)-(x2, y2) passes through.
+
+    Parameters:
+    x1, y1, x2, y2 (np.ndarray): Segment end points
+    origin (np.ndarray): Lower left corner of the grid
+    cell_size (np.ndarray): Cell width and height
+    shape (tuple): Number of rows and columns
+
+    Returns (segment, row, column): one entry for every cell of every segment
+    """
+    rows, columns = shape
+
+    # Rows spanned by each segment, then the x extent of the segment in each row
+    first_row, last_row = cell_range(np.minimum(y1, y2), np.maximum(y1, y2),
+                                     origin[1], cell_size[1], rows)
+    segment, row = expand(first_row, last_row)
+    band_low = origin[1] + row * cell_size[1]
+    band_high = band_low + cell_size[1]
+    dx, dy = x2[segment] - x1[segment], y2[segment] - y1[segment]
+    flat = dy == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_low = (band_low - y1[segment]) / dy
+        t_high = (band_high - y1[segment]) / dy
+    t0 = np.where(flat, 0.0, np.clip(np.minimum(t_low, t_high), 0, 1))
+    t1 = np.where(flat, 1.0, np.clip(np.maximum(t_low, t_high), 0, 1))
+    xa, xb = x1[segment] + t0 * dx, x1[segment] + t1 * dx
+    first_column, last_column = cell_range(np.minimum(xa, xb), np.maximum(xa, xb),
+                                           origin[0], cell_size[0], columns)
+
+    pair, column = expand(first_column, last_column)
+    return segment[pair], row[pair], column
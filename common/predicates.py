@@ -0,0 +1,179 @@
+import math
+from fractions import Fraction
+import numpy as np
+
+# Shared orientation and in-circle predicates.
+#
+# Every predicate first evaluates the determinant in floating point together
+# with Shewchuk's a priori error bound. Only when the result is closer to zero
+# than the bound, i.e. when the float sign cannot be trusted, the determinant
+# is evaluated again exactly with rational arithmetic. Well separated inputs
+# therefore cost a handful of float operations, and near-degenerate ones still
+# get the correct sign.
+#
+# Every exercise imports this one module after putting common/ on sys.path.
+
+EPSILON = 2.0 ** -53
+CCW_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+ICC_ERRBOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+
+def _as_float(value):
+    """Nearest float with the sign of an exact value, even if it underflows."""
+    if value == 0:
+        return 0.0
+    return math.copysign(max(abs(float(value)), 5e-324), value)
+
+
+def _orient2d_exact(ax, ay, bx, by, cx, cy):
+    """Exact orient2d determinant of float coordinates."""
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return _as_float((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+def _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy):
+    """Exact incircle determinant of float coordinates."""
+    ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return _as_float((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                     (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                     (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def orient2d_xy(ax, ay, bx, by, cx, cy):
+    """
+    orient2d on separate coordinates, for hot loops that already have them
+    unpacked. See orient2d.
+    """
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    det = detleft - detright
+
+    if detleft > 0:
+        if detright <= 0:
+            return det
+        detsum = detleft + detright
+    elif detleft < 0:
+        if detright >= 0:
+            return det
+        detsum = -detleft - detright
+    else:
+        return det
+
+    errbound = CCW_ERRBOUND * detsum
+    if det >= errbound or -det >= errbound:
+        return det
+    return _orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+def orient2d(a, b, c):
+    """
+    Orientation of the triangle (a, b, c).
+
+    Returns a positive value if a, b and c are in counter-clockwise order
+    (c lies left of the line from a to b), a negative value if they are in
+    clockwise order and zero if they are collinear. The sign is always exact;
+    the magnitude approximates twice the signed area of the triangle.
+    """
+    return orient2d_xy(a[0], a[1], b[0], b[1], c[0], c[1])
+
+
+def incircle(a, b, c, d):
+    """
+    Position of d relative to the circle through a, b and c.
+
+    Returns a positive value if d lies inside the circle, a negative value if
+    it lies outside and zero if the four points are cocircular, provided a, b
+    and c are in counter-clockwise order (the sign flips otherwise). The sign
+    is always exact.
+    """
+    ax, ay, bx, by, cx, cy, dx, dy = a[0], a[1], b[0], b[1], c[0], c[1], d[0], d[1]
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift +
+                 (abs(cdxady) + abs(adxcdy)) * blift +
+                 (abs(adxbdy) + abs(bdxady)) * clift)
+    errbound = ICC_ERRBOUND * permanent
+    if det > errbound or -det > errbound:
+        return det
+    return _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
+
+
+def _difference(a, b):
+    """a - b as floats; the coordinates are converted before subtracting."""
+    return np.subtract(a, b, dtype=float, casting='unsafe')
+
+
+def _exact_entries(det, uncertain, exact, *coordinates):
+    """
+    Replace the uncertain entries of det by exact values. Only those entries
+    of the coordinates are broadcast and converted.
+    """
+    det = np.array(det, dtype=float)
+    uncertain = np.asarray(uncertain)
+    values = [np.broadcast_to(np.asarray(v, dtype=float), det.shape)[uncertain].tolist()
+              for v in coordinates]
+    det[uncertain] = [exact(*entry) for entry in zip(*values)]
+    return det
+
+
+def orient2d_batch(ax, ay, bx, by, cx, cy):
+    """
+    Vectorized orient2d. The coordinates are arrays (or scalars) that
+    broadcast together; the result has the broadcast shape.
+    """
+    detleft = _difference(ax, cx) * _difference(by, cy)
+    detright = _difference(ay, cy) * _difference(bx, cx)
+    det = detleft - detright
+
+    # Terms of opposite signs cannot cancel, so |detleft + detright| bounds
+    # the rounding error as well as |detleft| + |detright| does
+    if det.ndim and detleft.shape == detright.shape == det.shape:
+        # Overwrite the temporaries rather than allocate more large arrays
+        errbound = np.add(detleft, detright, out=detleft)
+        np.abs(errbound, out=errbound)
+        errbound *= CCW_ERRBOUND
+        uncertain = np.abs(det, out=detright) < errbound
+    else:
+        uncertain = np.abs(det) < CCW_ERRBOUND * np.abs(detleft + detright)
+    if uncertain.any():
+        det = _exact_entries(det, uncertain, _orient2d_exact, ax, ay, bx, by, cx, cy)
+    return det
+
+
+def incircle_batch(ax, ay, bx, by, cx, cy, dx, dy):
+    """
+    Vectorized incircle. The coordinates are arrays (or scalars) that
+    broadcast together; the result has the broadcast shape.
+    """
+    adx, ady = _difference(ax, dx), _difference(ay, dy)
+    bdx, bdy = _difference(bx, dx), _difference(by, dy)
+    cdx, cdy = _difference(cx, dx), _difference(cy, dy)
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((np.abs(bdxcdy) + np.abs(cdxbdy)) * alift +
+                 (np.abs(cdxady) + np.abs(adxcdy)) * blift +
+                 (np.abs(adxbdy) + np.abs(bdxady)) * clift)
+    uncertain = np.abs(det) <= ICC_ERRBOUND * permanent
+    if uncertain.any():
+        det = _exact_entries(det, uncertain, _incircle_exact, ax, ay, bx, by, cx, cy, dx, dy)
+    return det
@@ -0,0 +1,194 @@
+import random
+from predicates import orient2d
+
+
+def _on_segment(a, b, p):
+    """True if p, known to be collinear with a and b, lies on the segment ab."""
+    return (min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and
+            min(a[1], b[1]) <= p[1] <= max(a[1], b[1]))
+
+
+def segments_intersect(p1, p2, q1, q2):
+    """
+    True if the closed segments p1p2 and q1q2 have a point in common,
+    including touching endpoints and collinear overlaps. Exact for float and
+    integer coordinates.
+    """
+    d1 = orient2d(q1, q2, p1)
+    d2 = orient2d(q1, q2, p2)
+    d3 = orient2d(p1, p2, q1)
+    d4 = orient2d(p1, p2, q2)
+    if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and \
+            ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
+        return True
+    return ((d1 == 0 and _on_segment(q1, q2, p1)) or
+            (d2 == 0 and _on_segment(q1, q2, p2)) or
+            (d3 == 0 and _on_segment(p1, p2, q1)) or
+            (d4 == 0 and _on_segment(p1, p2, q2)))
+
+
+# Sweep status: a treap of edge indices ordered from bottom to top. Nodes
+# are [edge, priority, left, right]; split and merge keep it balanced in
+# expectation, so every operation takes O(log n).
+
+def _split(node, goes_left):
+    """Split a treap into the edges for which goes_left holds and the rest."""
+    if node is None:
+        return None, None
+    if goes_left(node[0]):
+        left, right = _split(node[3], goes_left)
+        node[3] = left
+        return node, right
+    left, right = _split(node[2], goes_left)
+    node[2] = right
+    return left, node
+
+
+def _merge(left, right):
+    """Join two treaps, every edge of left being below every edge of right."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left[1] > right[1]:
+        left[3] = _merge(left[3], right)
+        return left
+    right[2] = _merge(left, right[2])
+    return right
+
+
+def _last(node):
+    if node is None:
+        return None
+    while node[3] is not None:
+        node = node[3]
+    return node[0]
+
+
+def _first(node):
+    if node is None:
+        return None
+    while node[2] is not None:
+        node = node[2]
+    return node[0]
+
+
+def _pop_first(node):
+    """Remove the lowest edge; returns (edge, remaining treap)."""
+    if node[2] is None:
+        return node[0], node[3]
+    edge, node[2] = _pop_first(node[2])
+    return edge, node
+
+
+def find_self_intersection(vertices):
+    """
+    Find two edges of a polygon that intersect, with the Shamos-Hoey sweep
+    in O(n log n).
+
+    Edge i joins vertex i and vertex i + 1 (the last edge closes the
+    polygon). Neighbouring edges may only share their common vertex; they
+    intersect if they fold back onto each other. A vertex that appears twice
+    counts as an intersection, as does an edge of length zero.
+
+    The edges cut by a vertical line sweeping from left to right are kept in
+    a balanced search tree ordered from bottom to top. Until the sweep
+    passes the leftmost intersection the order does not change, so only
+    edges that become neighbours in the tree have to be tested: a new edge
+    against the edges directly below and above it, and the two neighbours
+    of an edge when it is removed.
+
+    Parameters:
+    vertices (list): Polygon vertices as (x, y) pairs, or an array of shape (n, 2)
+
+    Returns (i, j) with i < j for the first intersecting pair found, or None
+    if the polygon is simple
+    """
+    if hasattr(vertices, 'tolist'):
+        vertices = vertices.tolist()
+    points = [tuple(v) for v in vertices]
+    n = len(points)
+    if n < 3:
+        raise ValueError("A polygon needs at least 3 vertices")
+
+    # A repeated vertex: the edges starting at both copies touch there
+    seen = {}
+    for i, point in enumerate(points):
+        if point in seen:
+            return seen[point], i
+        seen[point] = i
+
+    # Endpoints of every edge, left one first
+    ends = [tuple(sorted((points[i], points[(i + 1) % n]))) for i in range(n)]
+
+    def adjacent(i, j):
+        return (i - j) % n in (1, n - 1)
+
+    def cross(i, j):
+        if adjacent(i, j):
+            # They share a vertex and overlap only if they are collinear and
+            # leave it in the same direction
+            shared = points[max(i, j)] if abs(i - j) == 1 else points[0]
+            a = ends[i][1] if ends[i][0] == shared else ends[i][0]
+            b = ends[j][1] if ends[j][0] == shared else ends[j][0]
+            return (orient2d(shared, a, b) == 0 and
+                    (a[0] - shared[0]) * (b[0] - shared[0]) +
+                    (a[1] - shared[1]) * (b[1] - shared[1]) > 0)
+        return segments_intersect(ends[i][0], ends[i][1], ends[j][0], ends[j][1])
+
+    def below(i, j):
+        """True if edge i is below edge j where both are cut by the sweep line."""
+        (i1, i2), (j1, j2) = ends[i], ends[j]
+        if i1 >= j1:
+            side = orient2d(j1, j2, i1) or orient2d(j1, j2, i2)
+            return side < 0
+        side = orient2d(i1, i2, j1) or orient2d(i1, i2, j2)
+        return side > 0
+
+    # Removals sort before insertions at the same point
+    events = sorted([(ends[i][0], 1, i) for i in range(n)] +
+                    [(ends[i][1], 0, i) for i in range(n)])
+    priorities = random.Random(0)
+    status = None
+
+    for _, insert, edge in events:
+        if insert:
+            lower, upper = _split(status, lambda other: below(other, edge))
+            under, over = _last(lower), _first(upper)
+            node = [edge, priorities.random(), None, None]
+            status = _merge(_merge(lower, node), upper)
+            pairs = [(under, edge), (edge, over)]
+        else:
+            lower, upper = _split(status, lambda other: other != edge and below(other, edge))
+            _, upper = _pop_first(upper)
+            under, over = _last(lower), _first(upper)
+            status = _merge(lower, upper)
+            pairs = [(under, over)]
+        for i, j in pairs:
+            if i is not None and j is not None and cross(i, j):
+                return min(i, j), max(i, j)
+    return None
+
+
+def is_simple(vertices):
+    """True if the polygon does not intersect itself."""
+    return find_self_intersection(vertices) is None
+
+
+def check_simple(vertices, names=None):
+    """
+    Raise ValueError naming the first pair of intersecting edges if the
+    polygon is not simple.
+
+    Parameters:
+    vertices (list): Polygon vertices as (x, y) pairs, or an array of shape (n, 2)
+    names (list): Optional vertex names for the message
+    """
+    pair = find_self_intersection(vertices)
+    if pair is None:
+        return
+    n = len(vertices)
+    if names is None or len(names) < n:
+        names = [f"P{k}" for k in range(n)]
+    edges = [f"{names[k]}{names[(k + 1) % n]}" for k in pair]
+    raise ValueError(f"Polygon is not simple: edges {edges[0]} and {edges[1]} intersect")
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from chan_convex_hull import chan_convex_hull, graham_hull
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exercise_four'))
+from jarvis_march import Point, jarvis_march
+
+
+def polygon_with_interior(n, h, rng):
+    """
+    n points with exactly h hull vertices: the corners of a regular h-gon
+    and n - h points strictly inside its inscribed circle.
+    """
+    angles = 2 * np.pi * np.arange(h) / h
+    corners = np.column_stack([np.cos(angles), np.sin(angles)])
+    radius = 0.99 * np.cos(np.pi / h) * np.sqrt(rng.random(n - h))
+    theta = rng.random(n - h) * 2 * np.pi
+    inside = np.column_stack([radius * np.cos(theta), radius * np.sin(theta)])
+    return rng.permutation(np.vstack([corners, inside]))
+
+
+def run_graham(points):
+    return graham_hull(sorted(set(map(tuple, points.tolist()))))
+
+
+def run_jarvis(points):
+    return jarvis_march([Point(x, y) for x, y in points.tolist()])
+
+
+ALGORITHMS = {
+    'chan': chan_convex_hull,
+    'graham': run_graham,
+    'jarvis': run_jarvis,
+}
+
+
+def time_algorithm(algorithm, points):
+    """Return (seconds, number of hull vertices)."""
+    start = time.perf_counter()
+    hull = algorithm(points)
+    return time.perf_counter() - start, len(hull)
+
+
+def run_benchmark(n, hull_sizes, jarvis_limit=2 * 10**6, seed=0):
+    """
+    Time Chan's algorithm, Graham's scan and Jarvis' march on n points for
+    growing hull sizes and report where Chan stops beating the others.
+    Jarvis' march is skipped once n * h exceeds jarvis_limit.
+    """
+    rng = np.random.default_rng(seed)
+    print(f"{'n':>9} {'h':>7} " + " ".join(f"{name + ' (s)':>11}" for name in ALGORITHMS))
+    crossover = {}
+    for h in hull_sizes:
+        points = polygon_with_interior(n, h, rng)
+        times = {}
+        for name, algorithm in ALGORITHMS.items():
+            if name == 'jarvis' and n * h > jarvis_limit:
+                continue
+            times[name], size = time_algorithm(algorithm, points)
+            assert size == h, (name, size, h)
+        print(f"{n:>9} {h:>7} " + " ".join(
+            f"{times[name]:11.4f}" if name in times else f"{'-':>11}" for name in ALGORITHMS))
+        for name in times:
+            if name != 'chan' and name not in crossover and times[name] < times['chan']:
+                crossover[name] = h
+
+    for name in ALGORITHMS:
+        if name != 'chan':
+            where = f"from h = {crossover[name]}" if name in crossover else "nowhere in this range"
+            print(f"{name} beats chan {where}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chan's algorithm crossover benchmark")
+    parser.add_argument('--n', type=int, default=10**5, help="number of points")
+    parser.add_argument('--max-h', type=int, default=10**4, help="largest hull size")
+    parser.add_argument('--jarvis-limit', type=int, default=2 * 10**6,
+                        help="largest n * h timed with Jarvis' march")
+    args = parser.parse_args()
+    hull_sizes = [h for h in (4, 8, 16, 32, 64, 128, 256, 1024, 4096, 16384, 65536)
+                  if h <= min(args.max_h, args.n)]
+    run_benchmark(args.n, hull_sizes, jarvis_limit=args.jarvis_limit)
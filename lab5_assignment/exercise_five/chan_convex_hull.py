@@ -0,0 +1,153 @@
+from graham_scan import orientation
+
+# Results of orientation
+COLLINEAR, CLOCKWISE, COUNTERCLOCKWISE = 0, 1, 2
+
+
+def graham_hull(points):
+    """
+    Full convex hull of points sorted lexicographically, with Andrew's
+    variant of Graham's scan.
+
+    Returns the hull vertices counter-clockwise from the first point, without
+    points in the middle of an edge
+    """
+    if len(points) < 3:
+        return list(points)
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and orientation(lower[-2], lower[-1], p) != COUNTERCLOCKWISE:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and orientation(upper[-2], upper[-1], p) != COUNTERCLOCKWISE:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _squared_distance(p, q):
+    return (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2
+
+
+def _is_next(p, candidate, best, counterclockwise=False):
+    """
+    True if candidate is a better next hull vertex after p than best: it is
+    further clockwise as seen from p, or in the same direction but further
+    away. With counterclockwise set, the better previous hull vertex before p.
+    """
+    turn = orientation(p, best, candidate)
+    if turn == COLLINEAR:
+        return _squared_distance(p, candidate) > _squared_distance(p, best)
+    return turn == (COUNTERCLOCKWISE if counterclockwise else CLOCKWISE)
+
+
+def _tangent(hull, p, counterclockwise=False):
+    """
+    Index of the vertex of a convex polygon that is the next hull vertex
+    after p (or the previous one, with counterclockwise set), for a point p
+    strictly outside of it.
+
+    Seen from p the directions to the vertices first turn clockwise and then
+    back counter-clockwise while walking around the polygon, so the most
+    clockwise vertex is the minimum of a cyclic unimodal sequence and can be
+    found with a binary search in O(log k); the same holds for the most
+    counter-clockwise one.
+
+    Parameters:
+    hull (list): Vertices of the polygon in counter-clockwise order
+    p (tuple): A point outside the polygon
+    counterclockwise (bool): Find the most counter-clockwise vertex instead
+    """
+    k = len(hull)
+    if k <= 3:
+        best = 0
+        for i in range(1, k):
+            if _is_next(p, hull[i], hull[best], counterclockwise):
+                best = i
+        return best
+
+    def before(i, j):
+        return _is_next(p, hull[i], hull[j], counterclockwise)
+
+    falling = before(1, 0)
+    if not falling and not before(k - 1, 0):
+        return 0
+
+    # The minimum is in [low, high]. If the sequence falls after vertex 0,
+    # it falls to the minimum, rises and falls back to vertex 0; otherwise
+    # it rises first, falls to the minimum and rises back to vertex 0.
+    low, high = 1, k - 1
+    while low < high:
+        middle = (low + high) // 2
+        middle_falling = before(middle + 1, middle)
+        if falling:
+            go_right = middle_falling and before(middle, 0)
+        else:
+            go_right = middle_falling or not before(middle, 0)
+        if go_right:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _wrap(points, m):
+    """
+    One round of Chan's algorithm: hull the groups of m consecutive points
+    and gift-wrap around the group hulls for at most m steps.
+
+    Returns the hull, or None if it has more than m vertices
+    """
+    groups = [graham_hull(points[i:i + m]) for i in range(0, len(points), m)]
+
+    # The first point is the lowest leftmost one, vertex 0 of group 0
+    group, index = 0, 0
+    hull = [points[0]]
+    for _ in range(m):
+        p = groups[group][index]
+        # In its own group the next vertex follows p directly
+        own = groups[group]
+        best = (group, (index + 1) % len(own)) if len(own) > 1 else None
+        for other, other_hull in enumerate(groups):
+            if other == group:
+                continue
+            candidate = (other, _tangent(other_hull, p))
+            if best is None or _is_next(p, groups[candidate[0]][candidate[1]], groups[best[0]][best[1]]):
+                best = candidate
+
+        group, index = best
+        if groups[group][index] == points[0]:
+            return hull
+        hull.append(groups[group][index])
+    return None
+
+
+def chan_convex_hull(points):
+    """
+    Convex hull with Chan's algorithm in O(n log h).
+
+    The points are split into groups of m points, each group is hulled with
+    Graham's scan in O(m log m), and a Jarvis march over the group hulls takes
+    O((n / m) log m) per step because the next vertex in every group is found
+    with a binary search. The march gives up after m steps, and m is squared
+    until it reaches the hull size h.
+
+    Parameters:
+    points (list): Points as (x, y) tuples, or an array of shape (n, 2)
+
+    Returns the hull vertices counter-clockwise from the lowest leftmost point
+    """
+    if hasattr(points, 'tolist'):
+        points = points.tolist()
+    points = sorted(set(map(tuple, points)))
+    if len(points) < 3:
+        return points
+
+    t = 1
+    while True:
+        m = min(2 ** (2 ** t), len(points))
+        hull = _wrap(points, m)
+        if hull is not None:
+            return hull
+        t += 1
@@ -1,52 +1,268 @@
+import os
+import sys
+from array import array
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.patches as patches
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d
 
 def orientation(p, q, r):
-    val = (q[1] - p[1]) * (r[0] - q[0]) - (q[0] - p[0]) * (r[1] - q[1])
+    # orient2d is positive for counterclockwise turns and exact near zero
+    val = orient2d(p, q, r)
     if val == 0:
         return 0
-    return 1 if val > 0 else 2
+    return 1 if val < 0 else 2
 
-def andrew_convex_hull(points):
+# Operations in a hull trace
+PUSH, POP, CHECK = 0, 1, 2
+TRACE_DTYPE = np.dtype([('op', np.uint8), ('point', np.int32)])
+STATUS = {PUSH: 'adding point', POP: 'removing point', CHECK: 'checking orientation'}
+
+class HullTrace:
+    """
+    Compact record of the stack operations of Andrew's scan.
+
+    Every orientation test is a CHECK record and every change of the stack a
+    PUSH or POP record, each holding the index of the point being processed
+    in the sorted point list. The stack at any record is rebuilt on demand by
+    replaying the records after the nearest checkpoint, a copy of the stack
+    saved every checkpoint_interval records.
+
+    Indexing a trace gives the animation frames, one per PUSH or POP record,
+    as dicts with the keys 'points', 'lower', 'current' and 'status'.
+    """
+
+    def __init__(self, points, records, checkpoint_interval=1024):
+        """
+        Parameters:
+        points (list): The sorted points the records refer to
+        records (numpy.ndarray): Array of TRACE_DTYPE records
+        checkpoint_interval (int): Number of records between checkpoints
+        """
+        self.points = points
+        self.records = records
+        self.checkpoint_interval = checkpoint_interval
+        self.frames = np.flatnonzero(records['op'] != CHECK)
+
+        # _checkpoints[c] is the stack before record c * checkpoint_interval
+        self._checkpoints = []
+        stack = []
+        for start in range(0, len(records), checkpoint_interval):
+            self._checkpoints.append(np.array(stack, dtype=np.int32))
+            for op, point in records[start:start + checkpoint_interval].tolist():
+                self._apply(stack, op, point)
+        if len(records) % checkpoint_interval == 0:
+            # stack_before also accepts the position past the last record
+            self._checkpoints.append(np.array(stack, dtype=np.int32))
+        # Last stack rebuilt, so that playing frames in order replays one
+        # record per frame
+        self._cached = (0, [])
+
+    @staticmethod
+    def _apply(stack, op, point):
+        if op == PUSH:
+            stack.append(point)
+        elif op == POP:
+            stack.pop()
+
+    def stack_before(self, position):
+        """Point indices on the stack before the record at position."""
+        cached_position, cached_stack = self._cached
+        checkpoint = position // self.checkpoint_interval
+        start = checkpoint * self.checkpoint_interval
+        if start <= cached_position <= position:
+            start, stack = cached_position, list(cached_stack)
+        else:
+            stack = self._checkpoints[checkpoint].tolist()
+        for op, point in self.records[start:position].tolist():
+            self._apply(stack, op, point)
+        self._cached = (position, stack)
+        return list(stack)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, frame):
+        position = int(self.frames[frame])
+        op, point = self.records[position].tolist()
+        # A removal is shown before the point leaves the stack, an addition after
+        stack = self.stack_before(position + (op == PUSH))
+        return {
+            'points': self.points,
+            'lower': [self.points[i] for i in stack],
+            'current': self.points[point],
+            'status': STATUS[op]
+        }
+
+def andrew_convex_hull(points, record_steps=False):
+    """
+    Lower hull with Andrew's variant of Graham's scan.
+
+    Parameters:
+    points (list): Points as (x, y) tuples
+    record_steps (bool): Record the steps for the animation in a HullTrace,
+        five bytes per stack operation or orientation test
+
+    Returns (lower, steps); steps is a HullTrace if record_steps is set,
+    otherwise an empty list
+    """
     points = sorted(points)
     lower = []
-    steps = []
+    ops = array('B')
+    indices = array('i')
     
-    for p in points:
+    for index, p in enumerate(points):
         while len(lower) >= 2:
-            current_step = {
-                'points': points.copy(),
-                'lower': lower.copy(),
-                'current': p,
-                'status': 'checking orientation'
-            }
+            if record_steps:
+                ops.append(CHECK)
+                indices.append(index)
             
             if orientation(lower[-2], lower[-1], p) != 2:
                 lower.pop()
-                current_step['status'] = 'removing point'
+                if record_steps:
+                    ops.append(POP)
+                    indices.append(index)
             else:
                 break
-            
-            steps.append(current_step)
         
         lower.append(p)
         
-        current_step = {
-            'points': points.copy(),
-            'lower': lower.copy(),
-            'current': p,
-            'status': 'adding point'
-        }
-        steps.append(current_step)
+        if record_steps:
+            ops.append(PUSH)
+            indices.append(index)
     
-    return lower, steps
+    if not record_steps:
+        return lower, []
+    records = np.empty(len(ops), dtype=TRACE_DTYPE)
+    records['op'] = np.frombuffer(ops, dtype=np.uint8)
+    records['point'] = np.frombuffer(indices, dtype=np.int32)
+    return lower, HullTrace(points, records)
+
+def monotone_chain_hull(points, presorted=False):
+    """
+    Full convex hull (lower and upper chain) with Andrew's monotone chain,
+    without recording any steps.
+
+    The points are ordered with np.lexsort and every orientation test runs on
+    the original coordinates, so integer and Fraction inputs stay exact.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2), or a list of
+        (x, y) tuples
+    presorted (bool): The points are already sorted by (x, y); skip the sort
+
+    Returns integer array with the indices of the hull vertices,
+    counter-clockwise from the lowest leftmost point, without points in the
+    middle of an edge
+    """
+    points = np.asarray(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp)
+    if presorted:
+        order = np.arange(len(points))
+    else:
+        order = np.lexsort((points[:, 1], points[:, 0]))
+    # Repeated points are neighbours once sorted; keep the first of each
+    ordered = points[order]
+    distinct = np.concatenate([[True], np.any(ordered[1:] != ordered[:-1], axis=1)])
+    order = order[distinct]
+    coords = points[order].tolist()
+    n = len(coords)
+    if n < 3:
+        return order
+
+    def chain(positions):
+        kept = []
+        for k in positions:
+            p = coords[k]
+            while len(kept) >= 2 and orient2d(coords[kept[-2]], coords[kept[-1]], p) <= 0:
+                kept.pop()
+            kept.append(k)
+        return kept
+
+    lower = chain(range(n))
+    upper = chain(range(n - 1, -1, -1))
+    return order[lower[:-1] + upper[:-1]]
+
+class OnlineConvexHull:
+    """
+    Convex hull of a stream of points arriving sorted by x.
+
+    Andrew's lower and upper chains are extended as the points come in, so
+    every point costs amortized O(1) and the input is never stored. Points
+    with equal x may arrive in any order of y; a chain only keeps the lowest
+    (lower chain) or highest (upper chain) of them.
+
+    Example:
+    hull = OnlineConvexHull()
+    for point in sensor_feed:
+        hull.add(point)
+        current = hull.hull()
+    """
+
+    def __init__(self, points=()):
+        """
+        Parameters:
+        points (iterable): Initial points, sorted by x
+        """
+        self.lower = []
+        self.upper = []
+        self.count = 0
+        self.extend(points)
+
+    def add(self, point):
+        """Add the next point of the stream. Raises ValueError if its x is smaller than the previous one."""
+        point = tuple(point)
+        if self.lower and point[0] < self.lower[-1][0]:
+            raise ValueError(f"Point {point} arrives after x = {self.lower[-1][0]}; "
+                             f"the stream must be sorted by x")
+        self.count += 1
+        self._extend_chain(self.lower, point, 1)
+        self._extend_chain(self.upper, point, -1)
+
+    def extend(self, points):
+        """Add every point of an iterable, in order."""
+        for point in points:
+            self.add(point)
+
+    @staticmethod
+    def _extend_chain(chain, p, direction):
+        """
+        Append p to the lower (direction 1) or upper (direction -1) chain,
+        removing the points that stop being convex.
+        """
+        if chain and chain[-1][0] == p[0]:
+            # Same x as the last point: only the lower (upper) one can be on the chain
+            if direction * (p[1] - chain[-1][1]) >= 0:
+                return
+            chain.pop()
+        keep = 2 if direction == 1 else 1
+        while len(chain) >= 2 and orientation(chain[-2], chain[-1], p) != keep:
+            chain.pop()
+        chain.append(p)
+
+    def hull(self):
+        """
+        Current hull vertices, counter-clockwise from the lowest leftmost
+        point, without points in the middle of an edge. Takes O(h).
+        """
+        upper = self.upper[::-1]
+        if upper and upper[0] == self.lower[-1]:
+            upper = upper[1:]
+        if upper and upper[-1] == self.lower[0]:
+            upper = upper[:-1]
+        return self.lower + upper
+
+    def __len__(self):
+        """Return number of vertices of the current hull"""
+        return len(self.hull())
 
 def visualize_convex_hull(save_gif=True):
     points = [(1, 10), (-2, 7), (3, 8), (4, 10), (5, 7), (6, 7), (7, 11)]
     
-    lower_hull, steps = andrew_convex_hull(points)
+    lower_hull, steps = andrew_convex_hull(points, record_steps=True)
     
     fig, ax = plt.subplots(figsize=(12, 7))
     plt.title("Andrew's Convex Hull Algorithm - Lower Hull")
@@ -103,4 +319,5 @@ def visualize_convex_hull(save_gif=True):
     plt.tight_layout()
     plt.show()
 
-visualize_convex_hull()
+if __name__ == "__main__":
+    visualize_convex_hull()
@@ -0,0 +1,107 @@
+from graham_scan import orientation
+from chan_convex_hull import CLOCKWISE, COUNTERCLOCKWISE, graham_hull, _tangent
+
+
+def add_point(hull, p):
+    """
+    Convex hull of a convex polygon and one more point.
+
+    A point inside the polygon is found with a binary search over the fan of
+    triangles around vertex 0 and leaves the polygon unchanged; the same list
+    is returned, so hulls can be shared. For a point outside, the two tangent
+    vertices are found with binary searches and the chain between them that
+    faces the point is replaced by it. Both cases take O(log h) orientation
+    tests plus one list copy.
+
+    Parameters:
+    hull (list): Vertices counter-clockwise, without points in the middle of
+        an edge; the list is not modified
+    p (tuple): The new point
+
+    Returns the vertices of the new hull, counter-clockwise
+    """
+    k = len(hull)
+    if k < 3:
+        return graham_hull(sorted(set(hull + [p])))
+
+    origin = hull[0]
+    if (orientation(origin, hull[1], p) != CLOCKWISE and
+            orientation(origin, hull[-1], p) != COUNTERCLOCKWISE):
+        # p is in the wedge at vertex 0: find the fan triangle it falls in
+        low, high = 1, k - 1
+        while high - low > 1:
+            middle = (low + high) // 2
+            if orientation(origin, hull[middle], p) != CLOCKWISE:
+                low = middle
+            else:
+                high = middle
+        if orientation(hull[low], hull[low + 1], p) != CLOCKWISE:
+            return hull
+
+    after = _tangent(hull, p)
+    before = _tangent(hull, p, counterclockwise=True)
+    if after <= before:
+        return [p] + hull[after:before + 1]
+    return [p] + hull[after:] + hull[:before + 1]
+
+
+class SlidingWindowHull:
+    """
+    Convex hull of the last window points of a stream.
+
+    The window is a queue made of two stacks. New points are pushed on the
+    back stack, which keeps the hull of all its points. The front stack
+    holds the oldest points, each with the hull of itself and every newer
+    point on the front stack. When the front stack runs empty the back stack
+    is moved over, building those hulls with one add_point per point. The
+    hull of the window is the union of the two stack hulls.
+
+    A push and a pop take amortized O(log h) orientation tests, where h is
+    the size of the hulls involved, plus the copies of the changed hulls.
+    hull() merges the two stack hulls in O(h log h).
+    """
+
+    def __init__(self, window):
+        """
+        Parameters:
+        window (int): Number of most recent points in the hull
+        """
+        if window < 1:
+            raise ValueError("The window must hold at least one point")
+        self.window = window
+        self._front = []
+        self._back = []
+        self._back_hull = []
+
+    def push(self, point):
+        """Add the newest point, dropping the oldest one if the window is full."""
+        point = tuple(point)
+        self._back.append(point)
+        self._back_hull = add_point(self._back_hull, point)
+        if len(self) > self.window:
+            self.pop()
+
+    def pop(self):
+        """Remove and return the oldest point."""
+        if not self._front:
+            if not self._back:
+                raise IndexError("pop from an empty window")
+            hull = []
+            for point in reversed(self._back):
+                hull = add_point(hull, point)
+                self._front.append((point, hull))
+            self._back = []
+            self._back_hull = []
+        return self._front.pop()[0]
+
+    def hull(self):
+        """
+        Vertices of the hull of the window, counter-clockwise from the lowest
+        leftmost point, without points in the middle of an edge.
+        """
+        front_hull = self._front[-1][1] if self._front else []
+        return graham_hull(sorted(set(front_hull + self._back_hull)))
+
+    def __len__(self):
+        """Return number of points in the window"""
+        return len(self._front) + len(self._back)
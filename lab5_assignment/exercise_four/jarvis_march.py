@@ -2,70 +2,215 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import numpy as np
 import os
-
-# Ensure the outputs directory exists
-os.makedirs('outputs', exist_ok=True)
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d, orient2d_batch
 
 class Point:
+    """A point in the plane."""
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
-def orientation(p, q, r):
+    def __repr__(self):
+        return f"Point({self.x}, {self.y})"
+
+def as_points(coords):
+    """List of Point objects with the coordinates of the rows of an (n, 2) array."""
+    return [Point(x, y) for x, y in np.asarray(coords).tolist()]
+
+def as_array(points):
+    """(n, 2) array with the coordinates of a list of Point objects."""
+    return np.array([(p.x, p.y) for p in points]).reshape(-1, 2)
+
+# Names of the results of orientation, for printing
+ORIENTATIONS = ('Collinear', 'Clockwise', 'Counterclockwise')
+
+class TraceBuffer:
+    """
+    Tracer that keeps every event in memory.
+
+    A tracer is any callable taking an event name and its data. jarvis_march
+    reports a 'step' event with the point indices (p, q) each time it tries a
+    new hull edge, and orientation reports an 'orientation' event with the
+    points (p, q, r) and the result.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, *data):
+        self.events.append((event,) + data)
+
+    def steps(self):
+        """The (p, q) edges tried by jarvis_march, in order."""
+        return [event[1:] for event in self.events if event[0] == 'step']
+
+    def orientations(self):
+        """The (p, q, r, result) orientation tests, in order."""
+        return [event[1:] for event in self.events if event[0] == 'orientation']
+
+def print_tracer(event, *data):
+    """Tracer that prints every orientation test."""
+    if event == 'orientation':
+        p, q, r, result = data
+        print(f"Orientation test: p({p.x}, {p.y}), q({q.x}, {q.y}), r({r.x}, {r.y}) -> {ORIENTATIONS[result]}")
+
+def orientation(p, q, r, tracer=None):
     """Return the orientation of the triplet (p, q, r).
     0 -> p, q and r are collinear
     1 -> Clockwise
     2 -> Counterclockwise
+
+    tracer, if given, is called with ('orientation', p, q, r, result)
     """
-    val = (q.y - p.y) * (r.x - q.x) - (q.x - p.x) * (r.y - q.y)
-    
-    # Print the orientation test
-    print(f"Orientation test: p({p.x}, {p.y}), q({q.x}, {q.y}), r({r.x}, {r.y}) -> ", end="")
-    
+    # orient2d is positive for counterclockwise turns and exact near zero
+    val = orient2d((p.x, p.y), (q.x, q.y), (r.x, r.y))
     if val == 0:
-        print("Collinear")
-        return 0
-    elif val > 0:
-        print("Clockwise")
-        return 1
+        result = 0
+    elif val < 0:
+        result = 1
     else:
-        print("Counterclockwise")
-        return 2
+        result = 2
+    if tracer is not None:
+        tracer('orientation', p, q, r, result)
+    return result
+
+def squared_distance(p, q):
+    return (p.x - q.x) ** 2 + (p.y - q.y) ** 2
+
+def jarvis_march(points, tracer=None, vectorized=False):
+    """Perform the Jarvis March algorithm on a set of points.
+
+    Parameters:
+    points (list): List of Point objects, or an array of shape (n, 2)
+    tracer (callable): Receives a ('step', p, q) event for every hull edge
+        tried and the orientation events, e.g. a TraceBuffer; nothing is
+        recorded by default
+    vectorized (bool): Find each next vertex with NumPy over an (n, 2)
+        array (see _jarvis_march_vectorized)
+
+    Returns list of indices of the hull vertices
+    """
+    if vectorized:
+        coords = points if isinstance(points, np.ndarray) else as_array(points)
+        return _jarvis_march_vectorized(coords, tracer)
+    if isinstance(points, np.ndarray):
+        points = as_points(points)
 
-def jarvis_march(points):
-    """Perform the Jarvis March algorithm on a set of points."""
     n = len(points)
     if n < 3:
-        return [], []  # Return empty hull and steps if not enough points
+        return []  # Not enough points for a hull
 
     # Find the leftmost point
     leftmost = 0
     for i in range(1, n):
         if points[i].x < points[leftmost].x:
             leftmost = i
-        elif points[i].x == leftmost:
+        elif points[i].x == points[leftmost].x:
             if points[i].y > points[leftmost].y:
                 leftmost = i
 
     hull = []
     p = leftmost
-    steps = []
 
     while True:
         hull.append(p)
         q = (p + 1) % n
-        steps.append((p, q))  # Store step for animation
+        if tracer is not None:
+            tracer('step', p, q)  # Store step for animation
 
         for i in range(n):
-            if orientation(points[p], points[i], points[q]) == 2:
+            turn = orientation(points[p], points[i], points[q], tracer)
+            # Of collinear candidates take the farthest, so that the march
+            # never stops in the middle of an edge
+            if turn == 2 or (turn == 0 and squared_distance(points[p], points[i]) >
+                                           squared_distance(points[p], points[q])):
                 q = i
-                steps.append((p, q))  # Update steps when selecting a new q
+                if tracer is not None:
+                    tracer('step', p, q)  # Update steps when selecting a new q
+
+        p = q
+        # Compare coordinates, as a copy of the leftmost point also closes the hull
+        if points[p].x == points[leftmost].x and points[p].y == points[leftmost].y:
+            break
+
+    return hull
+
+def _jarvis_march_vectorized(coords, tracer=None):
+    """
+    Jarvis March with one NumPy pass over all points per hull vertex.
+
+    Coming into vertex p along the edge direction d, every point lies to the
+    left of d, and the next vertex is the one with the smallest
+    counter-clockwise turn from d. The turn is ranked with the pseudo-angle
+    1 - along / (|along| + left), where along and left are the components of
+    the point along and to the left of d; it grows from 0 to 2 with the angle,
+    so argmin gives the next vertex without any trigonometry. The choice is
+    then checked with exact orientation tests: while a point is strictly to
+    the right of the new edge, the farthest such point replaces it, and of
+    the points on the edge the farthest is taken.
+
+    Only 'step' events are reported to the tracer, one per hull edge.
+
+    Parameters:
+    coords (numpy.ndarray): Array of points with shape (n, 2)
+    tracer (callable): Optional tracer, as for jarvis_march
+
+    Returns list of indices of the hull vertices, in the same order as
+    jarvis_march
+    """
+    n = len(coords)
+    if n < 3:
+        return []
 
+    # The leftmost point, the highest one on ties
+    leftmost = int(np.lexsort((-coords[:, 1], coords[:, 0]))[0])
+    x = coords[:, 0].astype(float)
+    y = coords[:, 1].astype(float)
+
+    hull = []
+    p = leftmost
+    # Nothing is left of the leftmost point, as if it was reached going down
+    dx, dy = 0.0, -1.0
+
+    while True:
+        hull.append(p)
+        vx, vy = x - x[p], y - y[p]
+        along = dx * vx + dy * vy
+        left = dx * vy - dy * vx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            turn = 1 - along / (np.abs(along) + np.abs(left))
+        turn[(vx == 0) & (vy == 0)] = np.inf  # copies of p
+        q = int(np.argmin(turn))
+        if turn[q] == np.inf:
+            break  # every point is a copy of p
+
+        while True:
+            side = orient2d_batch(x[p], y[p], x[q], y[q], x, y)
+            outside = int(np.argmin(side))
+            if side[outside] >= 0:
+                break
+            q = outside
+        # Of collinear candidates take the farthest
+        q = int(np.argmax(np.where(side == 0, np.abs(vx) + np.abs(vy), -1)))
+        # Of copies of that point the loop over Point objects keeps the one
+        # it starts from, (p + 1) % n, and otherwise the first; argmax gave
+        # the first
+        following = (p + 1) % n
+        if x[following] == x[q] and y[following] == y[q]:
+            q = following
+        if tracer is not None:
+            tracer('step', p, q)
+
+        dx, dy = x[q] - x[p], y[q] - y[p]
         p = q
-        if p == leftmost:
+        if x[p] == x[leftmost] and y[p] == y[leftmost]:
             break
 
-    return hull, steps
+    return hull
 
 def plot_hull(step_idx, points, hull, steps):
     ax.clear()
@@ -103,21 +248,31 @@ def plot_hull(step_idx, points, hull, steps):
     ax.legend()
     ax.grid(True)
 
-# Points array
-points = [Point(2, -1), Point(1, 3), Point(4, 0), Point(4, 3), Point(5, 2)]
+if __name__ == "__main__":
+    # Ensure the outputs directory exists
+    os.makedirs('outputs', exist_ok=True)
+
+    # Points array
+    points = [Point(2, -1), Point(1, 3), Point(4, 0), Point(4, 3), Point(5, 2)]
 
-# Run Jarvis March to get the convex hull and steps for animation
-hull, steps = jarvis_march(points)
+    # Run Jarvis March, recording the steps for the animation
+    trace = TraceBuffer()
+    hull = jarvis_march(points, tracer=trace)
+    steps = trace.steps()
 
-# Create plot and animation
-fig, ax = plt.subplots()
+    # Print the orientation tests
+    for test in trace.orientations():
+        print_tracer('orientation', *test)
 
-# Set the animation speed to slower (1 second per frame)
-animation = FuncAnimation(fig, plot_hull, frames=len(steps), fargs=(points, hull, steps), repeat=False, interval=800)
+    # Create plot and animation
+    fig, ax = plt.subplots()
 
-# Ensure the steps list is not empty before saving
-if steps:
-    animation.save('outputs/jarvis_march_animation.gif', writer='pillow', fps=1)
+    # Set the animation speed to slower (1 second per frame)
+    animation = FuncAnimation(fig, plot_hull, frames=len(steps), fargs=(points, hull, steps), repeat=False, interval=800)
+
+    # Ensure the steps list is not empty before saving
+    if steps:
+        animation.save('outputs/jarvis_march_animation.gif', writer='pillow', fps=1)
 
-plt.show()
-plt.tight_layout()
+    plt.show()
+    plt.tight_layout()
@@ -0,0 +1,86 @@
+import argparse
+import time
+import numpy as np
+from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+
+
+def uniform_square(n, rng):
+    """Points uniformly distributed in the unit square."""
+    return rng.random((n, 2))
+
+
+def on_circle(n, rng):
+    """
+    Points sampled on the unit circle. Every point is a hull vertex, which is
+    the worst case for the number of sub-problems QuickHull has to solve.
+    """
+    angles = rng.random(n) * 2 * np.pi
+    return np.column_stack([np.cos(angles), np.sin(angles)])
+
+
+DISTRIBUTIONS = {
+    'uniform': uniform_square,
+    'circle': on_circle,
+}
+
+
+def time_hull(points, **kwargs):
+    """Return (seconds, hull) for a single hull computation."""
+    start = time.perf_counter()
+    hull = ConvexHull(points, **kwargs)
+    return time.perf_counter() - start, hull
+
+
+def run_benchmark(sizes, distributions=DISTRIBUTIONS, scalar_limit=10**5, prefilter=False, seed=0):
+    """
+    Compare the loop-based and the vectorized QuickHull.
+    The loop-based version is skipped above scalar_limit points.
+    """
+    rng = np.random.default_rng(seed)
+    print(f"{'distribution':>12} {'n':>9} {'h':>7} {'scalar (s)':>11} {'vectorized (s)':>15} {'speedup':>8}")
+    for name, generate in distributions.items():
+        for n in sizes:
+            points = generate(n, rng)
+            t_vec, hull = time_hull(points, vectorized=True, prefilter=prefilter)
+            if n <= scalar_limit:
+                t_scalar, reference = time_hull(points, prefilter=prefilter)
+                assert np.array_equal(reference.vertices, hull.vertices)
+                scalar, speedup = f"{t_scalar:11.4f}", f"{t_scalar / t_vec:7.1f}x"
+            else:
+                scalar, speedup = f"{'-':>11}", f"{'-':>8}"
+            culled = f" (culled {hull.prefilter_stats['culled_fraction']:.1%})" if prefilter else ""
+            print(f"{name:>12} {n:>9} {len(hull):>7} {scalar} {t_vec:15.4f} {speedup}{culled}")
+
+
+def run_parallel_benchmark(sizes, worker_counts, seed=0):
+    """Time ConvexHull_QuickHull.parallel for several numbers of workers."""
+    rng = np.random.default_rng(seed)
+    print(f"{'n':>10} {'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    for n in sizes:
+        points = uniform_square(n, rng)
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            ConvexHull.parallel(points, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{n:>10} {workers:>8} {elapsed:9.4f} {baseline / elapsed:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="QuickHull benchmark")
+    parser.add_argument('--max-n', type=int, default=10**6, help="largest input size")
+    parser.add_argument('--scalar-limit', type=int, default=10**5,
+                        help="largest input size timed with the loop-based version")
+    parser.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), action='append',
+                        help="distribution to run (repeatable, default: all)")
+    parser.add_argument('--prefilter', action='store_true', help="enable the Akl-Toussaint prefilter")
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help="time the parallel mode with these numbers of workers instead")
+    args = parser.parse_args()
+    distributions = {name: DISTRIBUTIONS[name] for name in args.distribution or DISTRIBUTIONS}
+    sizes = [n for n in (10**3, 10**4, 10**5, 10**6, 10**7) if n <= args.max_n]
+    if args.workers:
+        run_parallel_benchmark(sizes, args.workers)
+    else:
+        run_benchmark(sizes, distributions, scalar_limit=args.scalar_limit, prefilter=args.prefilter)
@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+from collections import deque, namedtuple
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_HERE, '..', '..', 'common'))
+from convexhull_quickhull_implementation import ConvexHull_QuickHull
+from predicates import orient2d, orient2d_batch
+
+# Andrew's monotone chain and Jarvis' march live in the other exercises
+for _exercise in ('exercise_five', 'exercise_four'):
+    sys.path.insert(0, os.path.join(_HERE, '..', _exercise))
+from graham_scan import monotone_chain_hull
+from jarvis_march import Point, jarvis_march
+
+METHODS = ('quickhull', 'andrew', 'jarvis')
+
+# Inputs up to this size always use Andrew's monotone chain, which beat the
+# vectorized QuickHull on every measured input of this size
+SMALL_N = 64
+# Number of points sampled to estimate the hull size
+SAMPLE_SIZE = 64
+# Above this fraction of sample points on the sample hull the points are
+# taken to be in convex position
+CONVEX_FRACTION = 0.5
+# Cost model in seconds, fitted to timings on uniform and circular inputs
+COSTS = {
+    'quickhull': lambda n, h: 1.2e-4 + 2e-7 * n + 1e-5 * h,
+    'andrew': lambda n, h: 3.3e-7 * n * np.log2(n),
+    'jarvis': lambda n, h: h * (2e-4 + 1.5e-7 * n),
+}
+# Andrew's scan on already sorted input saves most of the sort
+PRESORTED_DISCOUNT = 0.7
+
+HullDecision = namedtuple('HullDecision', [
+    'method', 'requested', 'n', 'dtype', 'presorted', 'sample_hull_size',
+    'estimated_h', 'estimated_costs', 'reason', 'select_seconds', 'hull_seconds', 'h'])
+
+# The most recent decisions, newest last, for tuning the thresholds above
+decisions = deque(maxlen=1000)
+
+
+def convex_hull(points, method="auto", seed=0):
+    """
+    Convex hull with the algorithm that suits the input best.
+
+    With method="auto" the hull size h is estimated from a random sample and
+    the expected cost of QuickHull, Andrew's monotone chain and Jarvis'
+    march is compared using COSTS. Small inputs, inputs already sorted by
+    (x, y) and integer coordinates too large for exact float arithmetic
+    favour Andrew's monotone chain, which works on Python numbers. Every call
+    appends a HullDecision with the choice and the timings to decisions.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2)
+    method (str): "auto", "quickhull", "andrew" or "jarvis"
+    seed (int): Seed for the sample used to estimate h
+
+    Returns array of indices into points of the hull vertices, in
+    counter-clockwise order from the lowest leftmost point
+    """
+    if method != "auto" and method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected 'auto' or one of {METHODS}")
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must have shape (n, 2)")
+    n = len(points)
+
+    start = time.perf_counter()
+    x, y = points[:, 0], points[:, 1]
+    dx, dy = np.diff(x), np.diff(y)
+    presorted = bool(np.all((dx > 0) | ((dx == 0) & (dy >= 0))))
+    sample_hull_size = estimated_h = None
+    costs = {}
+
+    if method != "auto":
+        chosen, reason = method, "requested"
+    elif n < 3:
+        chosen, reason = 'andrew', "fewer than 3 points"
+    elif not _exact_as_float(points):
+        chosen, reason = 'andrew', f"{points.dtype} coordinates are not exact as float64"
+    elif n <= SMALL_N:
+        chosen, reason = 'andrew', f"n <= SMALL_N ({SMALL_N})"
+    else:
+        sample_hull_size, estimated_h = _estimate_hull_size(points, seed)
+        costs = {name: float(cost(n, estimated_h)) for name, cost in COSTS.items()}
+        if presorted:
+            costs['andrew'] *= PRESORTED_DISCOUNT
+        chosen = min(costs, key=costs.get)
+        reason = "lowest estimated cost"
+    select_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if chosen == 'andrew':
+        # Already in the returned order, and computed on the exact coordinates
+        vertices = monotone_chain_hull(points, presorted=presorted)
+    else:
+        if chosen == 'quickhull':
+            vertices = ConvexHull_QuickHull(points, vectorized=True).vertices
+        else:
+            vertices = _jarvis(points)
+        vertices = _normalize(points, np.asarray(vertices, dtype=np.intp))
+    hull_seconds = time.perf_counter() - start
+
+    decisions.append(HullDecision(chosen, method, n, str(points.dtype), presorted, sample_hull_size,
+                                  estimated_h, costs, reason, select_seconds, hull_seconds,
+                                  len(vertices)))
+    return vertices
+
+
+def _exact_as_float(points):
+    """True if the coordinates convert to float64 without rounding."""
+    if points.dtype.kind == 'f':
+        return points.dtype.itemsize <= 8
+    if points.dtype.kind in 'iub':
+        return len(points) == 0 or int(np.abs(points).max()) <= 2**53
+    return False
+
+
+def _estimate_hull_size(points, seed):
+    """
+    Estimate the hull size from the hull of a random sample of SAMPLE_SIZE
+    points. If most of the sample is on its hull the points are taken to be
+    in convex position; otherwise the sample hull size is scaled by
+    (n / SAMPLE_SIZE) ** (1 / 3), the growth for points spread over a disk,
+    which overestimates it for polygonal regions.
+
+    Returns (sample hull size, estimated hull size)
+    """
+    n = len(points)
+    rng = np.random.default_rng(seed)
+    sample = points[rng.choice(n, size=min(n, SAMPLE_SIZE), replace=False)]
+    sample_hull_size = len(monotone_chain_hull(sample))
+    if sample_hull_size >= CONVEX_FRACTION * len(sample):
+        return sample_hull_size, n * sample_hull_size / len(sample)
+    return sample_hull_size, min(n, sample_hull_size * (n / len(sample)) ** (1 / 3))
+
+
+def _jarvis(points):
+    """Jarvis' march on the distinct points, mapped back to indices."""
+    # First index of every distinct point; np.unique cannot do object arrays
+    first = {}
+    for i, point in enumerate(map(tuple, points.tolist())):
+        first.setdefault(point, i)
+    first = np.array(sorted(first.values()), dtype=np.intp)
+    if len(first) < 3:
+        return first
+    if _exact_as_float(points):
+        hull = jarvis_march(points[first], vectorized=True)
+    else:
+        # Python numbers keep the orientation tests exact
+        hull = jarvis_march([Point(x, y) for x, y in points[first].tolist()])
+    return first[hull]
+
+
+def _normalize(points, vertices):
+    """
+    Bring a hull to counter-clockwise order from the lowest leftmost vertex
+    and drop vertices in the middle of an edge.
+    """
+    if len(vertices) < 3:
+        return vertices[np.lexsort((points[vertices, 1], points[vertices, 0]))]
+    x, y = points[vertices, 0], points[vertices, 1]
+    if _exact_as_float(points):
+        turn = orient2d_batch(np.roll(x, 1), np.roll(y, 1), x, y, np.roll(x, -1), np.roll(y, -1))
+    else:
+        # Python numbers keep the orientation tests exact
+        corners = points[vertices].tolist()
+        turn = np.array([orient2d(corners[i - 1], corners[i], corners[(i + 1) % len(corners)])
+                         for i in range(len(corners))])
+    if not np.any(turn):
+        # Collinear points: the hull is the segment between the extremes
+        order = np.lexsort((y, x))
+        return vertices[[order[0], order[-1]]]
+    if np.any(turn < 0):
+        vertices, turn = vertices[::-1], -turn[::-1]
+    vertices = vertices[turn != 0]
+    first = np.lexsort((points[vertices, 1], points[vertices, 0]))[0]
+    return np.roll(vertices, -first)
@@ -1,11 +1,46 @@
+import os
+import sys
 import matplotlib.pyplot as plt
+import numpy as np
 from math import atan2
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from simple_polygon import check_simple
+
+def pseudo_angle(dx, dy):
+    """
+    Monotone stand-in for atan2(dy, dx) without trigonometry.
+
+    dx / (|dx| + |dy|) runs from 1 to -1 over each half plane, so the
+    quadrant (the sign of dy) plus that ratio gives a value in [-2, 2] that
+    orders directions exactly like atan2 in (-pi, pi]. The zero vector gets 0,
+    like atan2(0, 0).
+
+    Parameters:
+    dx, dy (numpy.ndarray): Components of the directions
+
+    Returns array of pseudo-angles
+    """
+    dx = np.asarray(dx, dtype=float)
+    dy = np.asarray(dy, dtype=float)
+    with np.errstate(invalid='ignore'):
+        ratio = dx / (np.abs(dx) + np.abs(dy))
+    angle = np.where(dy >= 0, 1 - ratio, ratio - 1)
+    return np.where((dx == 0) & (dy == 0), 0.0, angle)
 
 def compute_polygon(points):
     """
     Compute a simple polygon that includes all points by sorting them
     in counter-clockwise order around the centroid.
+
+    A list of (x, y) tuples is sorted in place. A NumPy array of shape (n, 2)
+    takes the vectorized path: the centroid is a NumPy mean, the points are
+    ordered with an argsort of pseudo_angle, and a sorted copy is returned.
+    Points at the same angle may come out in a different order than with
+    the list.
     """
+    if isinstance(points, np.ndarray):
+        return compute_polygons(points[np.newaxis])[0]
+
     # Calculate the centroid of the points
     cx = sum(x for x, y in points) / len(points)
     cy = sum(y for x, y in points) / len(points)
@@ -14,6 +49,23 @@ def compute_polygon(points):
     points.sort(key=lambda p: atan2(p[1] - cy, p[0] - cx))
     return points
 
+def compute_polygons(point_sets):
+    """
+    compute_polygon for many point sets of the same size at once.
+
+    Parameters:
+    point_sets (numpy.ndarray): Array of shape (k, n, 2), k sets of n points
+
+    Returns array of shape (k, n, 2), every set in counter-clockwise order
+    around its own centroid
+    """
+    point_sets = np.asarray(point_sets)
+    centroids = point_sets.mean(axis=1, keepdims=True)
+    offsets = point_sets - centroids
+    angles = pseudo_angle(offsets[..., 0], offsets[..., 1])
+    order = np.argsort(angles, axis=1)
+    return np.take_along_axis(point_sets, order[..., np.newaxis], axis=1)
+
 def plot_polygon(points, polygon):
     """
     Plot the points and the computed polygon, with vertex coordinates.
@@ -47,5 +99,9 @@ if __name__ == "__main__":
     # Compute the polygon
     polygon = compute_polygon(points)
 
+    # Points at the same angle around the centroid can make the polygon
+    # cross itself; stop before drawing it
+    check_simple(polygon)
+
     # Plot the points and polygon
     plot_polygon(points, polygon)
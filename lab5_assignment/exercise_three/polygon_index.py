@@ -0,0 +1,226 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d_batch
+from grid import expand, segment_cells, within
+
+
+class PolygonIndex:
+    """
+    Polygon prepared for point-in-polygon queries in about O(1) each.
+
+    The bounding box is split into a uniform grid and every edge is listed
+    in the grid cells it passes through. Whether the centre of every cell is
+    inside is found once, with a horizontal ray per grid row. A query point
+    then only tests the edges of its own cell: every edge properly crossed
+    by the segment from the cell centre to the point flips the answer of the
+    centre. With about as many cells as edges a cell holds a few edges, so a
+    query costs O(1) for polygons whose edges are spread evenly.
+
+    All tests on the query points use exact orientation signs. Queries that
+    hit a degenerate case (a vertex on the segment from the centre, or a
+    centre on the boundary) are answered by an exact crossing-number test
+    over all edges instead. A polygon that crosses itself is classified with
+    the even-odd rule.
+    """
+    # Results of locate
+    OUTSIDE = -1
+    ON_BOUNDARY = 0
+    INSIDE = 1
+    # Query points processed at once by locate, to bound temporary memory
+    LOCATE_CHUNK = 10**6
+
+    def __init__(self, vertices, cells=None):
+        """
+        Parameters:
+        vertices: Polygon vertices in order, as an array of shape (n, 2) or
+            a list of (x, y) pairs
+        cells (int): Approximate number of grid cells; defaults to twice the
+            number of edges
+        """
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        if len(vertices) < 3:
+            raise ValueError("A polygon needs at least 3 vertices")
+        self.vertices = vertices
+        following = np.roll(vertices, -1, axis=0)
+        # Edges of length zero never decide anything
+        keep = np.any(vertices != following, axis=1)
+        self._starts = vertices[keep]
+        self._ends = following[keep]
+
+        self.low = vertices.min(axis=0)
+        self.high = vertices.max(axis=0)
+        size = self.high - self.low
+        if np.any(size == 0):
+            raise ValueError("The polygon has no area")
+        if cells is None:
+            cells = 2 * len(self._starts)
+        # A long thin polygon would otherwise get a row or column of cells
+        # far longer than its number of edges
+        limit = 4 * len(self._starts)
+        with np.errstate(divide='ignore', over='ignore'):
+            aspect = size[0] / size[1]
+            columns = int(np.clip(np.rint(np.sqrt(cells * aspect)), 1, limit))
+            rows = int(np.clip(np.rint(np.sqrt(cells / aspect)), 1, limit))
+        self.shape = (rows, columns)
+        self.cell_size = size / (columns, rows)
+        # Cell centres closer than this to an edge crossing are not trusted
+        self._margin = 1e-9 * np.abs(np.concatenate([self.low, self.high])).max()
+
+        self._register_edges()
+        self._classify_centres()
+
+    def __len__(self):
+        """Return number of vertices of the polygon"""
+        return len(self.vertices)
+
+    def _register_edges(self):
+        """List every edge in the cells it passes through, grouped by cell."""
+        rows, columns = self.shape
+        edge, row, column = segment_cells(self._starts[:, 0], self._starts[:, 1],
+                                          self._ends[:, 0], self._ends[:, 1],
+                                          self.low, self.cell_size, self.shape)
+        # Every edge once for every row it spans
+        self._row_edges = np.divmod(np.unique(edge * rows + row), rows)
+        cell = row * columns + column
+        order = np.argsort(cell, kind='stable')
+        self._cell_edges = edge[order]
+        self._cell_starts = np.concatenate(
+            [[0], np.cumsum(np.bincount(cell, minlength=rows * columns))])
+
+    def _centres(self, cells):
+        """Coordinates of the centres of the given cells."""
+        row, column = np.divmod(cells, self.shape[1])
+        return (self.low[0] + (column + 0.5) * self.cell_size[0],
+                self.low[1] + (row + 0.5) * self.cell_size[1])
+
+    def _classify_centres(self):
+        """Find which cell centres are inside, and which are too close to call."""
+        rows, columns = self.shape
+        x1, y1 = self._starts[:, 0], self._starts[:, 1]
+        x2, y2 = self._ends[:, 0], self._ends[:, 1]
+        centre_x = self.low[0] + (np.arange(columns) + 0.5) * self.cell_size[0]
+        self._inside = np.zeros((rows, columns), dtype=bool)
+        self._unsafe = np.zeros((rows, columns), dtype=bool)
+
+        # Every edge that crosses the line through the centres of a row is
+        # listed in that row
+        edge, row = self._row_edges
+        by_row = np.argsort(row, kind='stable')
+        row_starts = np.searchsorted(row[by_row], np.arange(rows + 1))
+        for r in range(rows):
+            edges = edge[by_row[row_starts[r]:row_starts[r + 1]]]
+            y = self.low[1] + (r + 0.5) * self.cell_size[1]
+            edges = edges[(y1[edges] > y) != (y2[edges] > y)]
+            crossings = np.sort(x1[edges] + (y - y1[edges]) * (x2[edges] - x1[edges]) /
+                                (y2[edges] - y1[edges]))
+            before = np.searchsorted(crossings, centre_x)
+            self._inside[r] = before % 2 == 1
+            if len(crossings):
+                nearest = np.minimum(
+                    np.abs(centre_x - crossings[np.maximum(before - 1, 0)]),
+                    np.abs(crossings[np.minimum(before, len(crossings) - 1)] - centre_x))
+                self._unsafe[r] = nearest <= self._margin
+
+        # Centres exactly on an edge of their cell
+        cells = np.repeat(np.arange(rows * columns), np.diff(self._cell_starts))
+        cx, cy = self._centres(cells)
+        a, b = self._starts[self._cell_edges], self._ends[self._cell_edges]
+        side = orient2d_batch(a[:, 0], a[:, 1], b[:, 0], b[:, 1], cx, cy)
+        on_edge = (side == 0) & within(a[:, 0], a[:, 1], b[:, 0], b[:, 1], cx, cy)
+        self._unsafe.flat[cells[on_edge]] = True
+
+    def locate(self, points):
+        """
+        Classify points as INSIDE, ON_BOUNDARY or OUTSIDE of the polygon.
+
+        Parameters:
+        points (numpy.ndarray): A point of shape (2,) or points of shape (m, 2)
+
+        Returns an int for a single point, otherwise an int array of shape (m,)
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim == 1:
+            return int(self.locate(points[None])[0])
+
+        result = np.empty(len(points), dtype=np.int8)
+        for first in range(0, len(points), self.LOCATE_CHUNK):
+            chunk = points[first:first + self.LOCATE_CHUNK]
+            result[first:first + len(chunk)] = self._locate_chunk(chunk)
+        return result
+
+    def _locate_chunk(self, points):
+        """locate for a moderate number of points at once."""
+        result = np.full(len(points), self.OUTSIDE, dtype=np.int8)
+        # Compare with the corners themselves; low + cell_size * shape can
+        # round below the maximum, and the last row and column are clipped
+        # into the grid below anyway
+        in_box = np.all((points >= self.low) & (points <= self.high), axis=1)
+        queries = np.flatnonzero(in_box)
+        qx, qy = points[queries, 0], points[queries, 1]
+        rows, columns = self.shape
+        row = np.clip(((qy - self.low[1]) // self.cell_size[1]).astype(np.intp), 0, rows - 1)
+        column = np.clip(((qx - self.low[0]) // self.cell_size[0]).astype(np.intp), 0, columns - 1)
+        cell = row * columns + column
+
+        # One entry for every edge of the cell of every query
+        owner, slot = expand(self._cell_starts[cell], self._cell_starts[cell + 1] - 1)
+        edge = self._cell_edges[slot]
+        ax, ay = self._starts[edge, 0], self._starts[edge, 1]
+        bx, by = self._ends[edge, 0], self._ends[edge, 1]
+        px, py = qx[owner], qy[owner]
+        centre_x, centre_y = self._centres(cell)
+        cx, cy = centre_x[owner], centre_y[owner]
+
+        # Only edges with a vertex on each side of the line through the
+        # centre and the point (or on it) can cross the segment or hold the point
+        a_side = np.sign(orient2d_batch(cx, cy, px, py, ax, ay))
+        b_side = np.sign(orient2d_batch(cx, cy, px, py, bx, by))
+        near = np.flatnonzero(a_side * b_side <= 0)
+        owner, a_side, b_side = owner[near], a_side[near], b_side[near]
+        ax, ay, bx, by = ax[near], ay[near], bx[near], by[near]
+        px, py, cx, cy = px[near], py[near], cx[near], cy[near]
+
+        point_side = np.sign(orient2d_batch(ax, ay, bx, by, px, py))
+        centre_side = np.sign(orient2d_batch(ax, ay, bx, by, cx, cy))
+        on_edge = (point_side == 0) & within(ax, ay, bx, by, px, py)
+        crossing = (point_side * centre_side < 0) & (a_side * b_side < 0)
+        # A vertex on the segment from the centre makes the count ambiguous
+        touching = (((a_side == 0) & within(cx, cy, px, py, ax, ay)) |
+                    ((b_side == 0) & within(cx, cy, px, py, bx, by)))
+
+        m = len(queries)
+        boundary = np.bincount(owner, weights=on_edge, minlength=m) > 0
+        flips = np.bincount(owner, weights=crossing, minlength=m).astype(np.intp) % 2 == 1
+        exact = (np.bincount(owner, weights=touching, minlength=m) > 0) | self._unsafe.flat[cell]
+
+        inside = self._inside.flat[cell] ^ flips
+        result[queries] = np.where(inside, self.INSIDE, self.OUTSIDE)
+        result[queries[boundary]] = self.ON_BOUNDARY
+        slow = queries[exact & ~boundary]
+        if len(slow):
+            result[slow] = self._locate_exact(points[slow])
+        return result
+
+    def _locate_exact(self, points):
+        """
+        locate with a horizontal ray against every edge, for the few points
+        the grid cannot decide. Takes O(n) per point.
+        """
+        ax, ay = self._starts[:, 0], self._starts[:, 1]
+        bx, by = self._ends[:, 0], self._ends[:, 1]
+        upward = by > ay
+        result = np.empty(len(points), dtype=np.int8)
+        for i, (x, y) in enumerate(points.tolist()):
+            side = orient2d_batch(ax, ay, bx, by, x, y)
+            if np.any((side == 0) & within(ax, ay, bx, by, x, y)):
+                result[i] = self.ON_BOUNDARY
+                continue
+            # The ray to the left crosses an edge that spans its height (half
+            # open, so a vertex counts once) and passes to the left of the point
+            spans = (ay > y) != (by > y)
+            left = np.where(upward, side < 0, side > 0)
+            result[i] = self.INSIDE if np.count_nonzero(spans & left) % 2 else self.OUTSIDE
+        return result
@@ -0,0 +1,261 @@
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d_batch
+
+
+class ConvexPolygon:
+    """
+    Convex polygon prepared for logarithmic-time queries.
+
+    The vertices are stored counter-clockwise together with the direction
+    angles of the edges. Going around a convex polygon these angles increase
+    monotonically, so the vertex that is extreme in any direction can be
+    found with a binary search over them.
+    """
+    # Results of locate
+    OUTSIDE = -1
+    ON_BOUNDARY = 0
+    INSIDE = 1
+    # Query points processed at once by locate, to bound temporary memory
+    LOCATE_CHUNK = 10**6
+
+    def __init__(self, hull):
+        """
+        Parameters:
+        hull: A ConvexHull_QuickHull, or an array of shape (h, 2) with the
+            vertices of a convex polygon in clockwise or counter-clockwise order
+        """
+        if hasattr(hull, 'vertices') and hasattr(hull, 'points'):
+            vertices = hull.points[hull.vertices]
+        else:
+            vertices = hull
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        if len(vertices) == 0:
+            raise ValueError("A convex polygon needs at least one vertex")
+
+        x, y = vertices[:, 0], vertices[:, 1]
+        if np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)) < 0:
+            vertices = vertices[::-1]
+
+        # Drop vertices in the middle of an edge, so that at most one edge is
+        # parallel to any direction on each side of the polygon
+        if len(vertices) > 2:
+            before = np.roll(vertices, 1, axis=0)
+            after = np.roll(vertices, -1, axis=0)
+            turn = orient2d_batch(before[:, 0], before[:, 1], vertices[:, 0], vertices[:, 1],
+                                  after[:, 0], after[:, 1])
+            if (turn != 0).sum() >= 3:
+                vertices = vertices[turn != 0]
+
+        # Start at the edge with the smallest angle, so that the edge angles
+        # increase over [angles[0], angles[0] + 2 * pi)
+        edges = np.roll(vertices, -1, axis=0) - vertices
+        angles = np.arctan2(edges[:, 1], edges[:, 0])
+        first = int(np.argmin(angles)) if len(vertices) > 1 else 0
+        self.vertices = np.roll(vertices, -first, axis=0)
+        self._angles = np.roll(angles, -first)
+        self._angles[self._angles < self._angles[0]] += 2 * np.pi
+
+    def __len__(self):
+        """Return number of vertices of the polygon"""
+        return len(self.vertices)
+
+    def locate(self, points):
+        """
+        Classify points as INSIDE, ON_BOUNDARY or OUTSIDE of the polygon.
+
+        The polygon is seen as a fan of triangles around vertex 0. A binary
+        search on the side of the fan diagonals finds the triangle whose
+        wedge holds the point, and one more side test against the polygon
+        edge closing that triangle decides. Every point takes O(log h).
+
+        Parameters:
+        points (numpy.ndarray): A point of shape (2,) or points of shape (m, 2)
+
+        Returns an int for a single point, otherwise an int array of shape (m,)
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim == 1:
+            return int(self.locate(points[None])[0])
+
+        result = np.empty(len(points), dtype=np.int8)
+        for first in range(0, len(points), self.LOCATE_CHUNK):
+            chunk = points[first:first + self.LOCATE_CHUNK]
+            result[first:first + len(chunk)] = self._locate_chunk(chunk)
+        return result
+
+    def _locate_chunk(self, points):
+        """locate for a moderate number of points at once."""
+        vertices = self.vertices
+        h = len(vertices)
+        origin = vertices[0]
+        px = points[:, 0] - origin[0]
+        py = points[:, 1] - origin[1]
+
+        def side(i, x=points[:, 0], y=points[:, 1]):
+            """Side of the points relative to the diagonal from vertex 0 to vertex i."""
+            return orient2d_batch(origin[0], origin[1], vertices[i, 0], vertices[i, 1], x, y)
+
+        def on_segment(i):
+            """Points on the segment from vertex 0 to vertex i, given they are on its line."""
+            dot = (vertices[i, 0] - origin[0]) * px + (vertices[i, 1] - origin[1]) * py
+            return (dot >= 0) & (dot <= ((vertices[i] - origin) ** 2).sum())
+
+        result = np.full(len(points), self.OUTSIDE, dtype=np.int8)
+        if h < 3:
+            # A point or a segment has no interior
+            if h == 1:
+                result[(px == 0) & (py == 0)] = self.ON_BOUNDARY
+            else:
+                result[(side(1) == 0) & on_segment(1)] = self.ON_BOUNDARY
+            return result
+
+        # Points on the first or the last edge lie on one of the outer diagonals
+        first_side, last_side = side(1), side(h - 1)
+        result[(first_side == 0) & on_segment(1)] = self.ON_BOUNDARY
+        result[(last_side == 0) & on_segment(h - 1)] = self.ON_BOUNDARY
+        in_wedge = (first_side > 0) & (last_side < 0)
+
+        # Binary search for the fan triangle (0, low, low + 1) holding each point
+        low = np.ones(in_wedge.sum(), dtype=np.intp)
+        high = np.full(len(low), h - 1, dtype=np.intp)
+        wx, wy = points[in_wedge, 0], points[in_wedge, 1]
+        while np.any(high - low > 1):
+            middle = (low + high) // 2
+            left = side(middle, wx, wy) >= 0
+            low = np.where(left, middle, low)
+            high = np.where(left, high, middle)
+
+        # Side of the polygon edge from vertex low to vertex low + 1
+        a, b = vertices[low], vertices[low + 1]
+        edge = orient2d_batch(a[:, 0], a[:, 1], b[:, 0], b[:, 1], wx, wy)
+        result[in_wedge] = np.where(edge > 0, self.INSIDE,
+                                    np.where(edge == 0, self.ON_BOUNDARY, self.OUTSIDE))
+        return result
+
+    def extreme_vertices(self, directions):
+        """
+        Index of the vertex with the largest projection on each direction.
+
+        Parameters:
+        directions (numpy.ndarray): Array of shape (m, 2)
+
+        Returns integer array of shape (m,)
+        """
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        h = len(self.vertices)
+        if h == 1:
+            return np.zeros(len(directions), dtype=np.intp)
+
+        # The maximum is where the edges stop pointing along the direction,
+        # i.e. the start of the first edge turned a quarter turn or more from it
+        target = np.arctan2(directions[:, 1], directions[:, 0]) + np.pi / 2
+        target = self._angles[0] + np.mod(target - self._angles[0], 2 * np.pi)
+        best = np.searchsorted(self._angles, target) % h
+
+        # The angles are rounded, so settle ties and off-by-one results by
+        # comparing with the neighbours; the projection is unimodal
+        projection = lambda i: (self.vertices[i] * directions).sum(axis=1)
+        for step in (-1, 1):
+            neighbour = (best + step) % h
+            best = np.where(projection(neighbour) > projection(best), neighbour, best)
+        return best
+
+    def trajectory_interval(self, start, direction):
+        """
+        Parameter interval during which start + lambda * direction lies
+        inside the polygon or on its boundary.
+
+        Returns (entry, exit), or None if the trajectory misses the polygon
+        """
+        entry, exit = self.trajectory_intervals([start], [direction])
+        if np.isnan(entry[0]):
+            return None
+        return float(entry[0]), float(exit[0])
+
+    def trajectory_intervals(self, starts, directions):
+        """
+        Batch version of trajectory_interval for m linear trajectories.
+
+        The line through every trajectory is compared with the two vertices
+        that are extreme across it; if it passes between them it crosses the
+        two chains joining them, and each crossing edge is found by binary
+        search. Every query takes O(log h).
+
+        Parameters:
+        starts (numpy.ndarray): Points at lambda = 0, shape (m, 2)
+        directions (numpy.ndarray): Velocities, shape (m, 2), non-zero
+
+        Returns (entry, exit) arrays of shape (m,), NaN where a trajectory
+        misses the polygon
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        speed = (directions ** 2).sum(axis=1)
+        if np.any(speed == 0):
+            raise ValueError("Trajectory directions must be non-zero")
+
+        vertices = self.vertices
+        h = len(vertices)
+        normals = np.column_stack([-directions[:, 1], directions[:, 0]])
+
+        def side(i):
+            """Offset of vertex i (one per trajectory) across its trajectory."""
+            return (vertices[i] * normals).sum(axis=1)
+
+        def parameter(points):
+            """Lambda at which each trajectory passes the given points."""
+            return ((points - starts) * directions).sum(axis=1) / speed
+
+        level = (starts * normals).sum(axis=1)
+        top = self.extreme_vertices(normals)
+        bottom = self.extreme_vertices(-normals)
+        f_top, f_bottom = side(top), side(bottom)
+
+        entry = np.full(len(starts), np.nan)
+        exit = np.full(len(starts), np.nan)
+
+        # Lines through an extreme vertex touch the polygon in that vertex,
+        # or along the edge next to it when the edge is parallel
+        for extreme, value in ((top, f_top), (bottom, f_bottom)):
+            touching = level == value
+            if not touching.any():
+                continue
+            low = parameter(vertices[extreme])
+            high = low.copy()
+            for step in (-1, 1):
+                neighbour = (extreme + step) % h
+                parallel = side(neighbour) == value
+                at = parameter(vertices[neighbour])
+                low = np.where(parallel, np.minimum(low, at), low)
+                high = np.where(parallel, np.maximum(high, at), high)
+            entry[touching], exit[touching] = low[touching], high[touching]
+
+        crossing = (level > f_bottom) & (level < f_top)
+        if crossing.any():
+            sub = crossing
+            crossings = []
+            # Counter-clockwise from bottom to top the offset increases, from
+            # top to bottom it decreases; find the first vertex past the line
+            for first, last, rising in ((bottom, top, True), (top, bottom, False)):
+                low = np.zeros(len(starts), dtype=np.intp)
+                high = (last - first) % h
+                while np.any(sub & (high - low > 1)):
+                    middle = (low + high) // 2
+                    f_middle = side((first + middle) % h)
+                    past = f_middle > level if rising else f_middle < level
+                    high = np.where(past, middle, high)
+                    low = np.where(past, low, middle)
+                p = vertices[(first + low) % h]
+                q = vertices[(first + high) % h]
+                f_p, f_q = (p * normals).sum(axis=1), (q * normals).sum(axis=1)
+                # Rows outside sub may divide by zero; they are discarded
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    t = (level - f_p) / (f_q - f_p)
+                    crossings.append(parameter(p + t[:, None] * (q - p)))
+            entry[sub] = np.minimum(*crossings)[sub]
+            exit[sub] = np.maximum(*crossings)[sub]
+
+        return entry, exit
@@ -1,97 +1,323 @@
+import sys
+import heapq
+import os
+from functools import reduce
+from multiprocessing import Pool, shared_memory
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import CCW_ERRBOUND, EPSILON, orient2d, orient2d_xy, orient2d_batch
 
 class ConvexHull_QuickHull:
-    def __init__(self, points):
+    # Sub-problems up to this size are solved without NumPy in vectorized mode
+    SMALL_SUBPROBLEM = 32
+    # Point sets up to this size are solved together in batch
+    SMALL_BATCH_SET = 16
+    # Points tested at once by the Akl-Toussaint prefilter, to bound temporary memory
+    PREFILTER_CHUNK = 2**18
+    
+    def __init__(self, points, vectorized=False, prefilter=False):
         """
         Compute the convex hull using QuickHull algorithm.
         
         Parameters:
         points (numpy.ndarray): Array of points with shape (n, 2)
+        vectorized (bool): Partition the points with NumPy masks instead of
+            Python loops. Gives the same hull, much faster on large inputs.
+        prefilter (bool): Discard the points strictly inside the Akl-Toussaint
+            octagon before running QuickHull. How many points were culled is
+            reported in prefilter_stats.
         """
-        self.points = np.asarray(points)
-        self.vertices = self._quickhull()
+        self._set_points(points, vectorized=vectorized, prefilter=prefilter)
+        if prefilter:
+            candidates = self._akl_toussaint_filter()
+            n = len(self.points)
+            self.prefilter_stats = {
+                'total': n,
+                'culled': n - len(candidates),
+                'remaining': len(candidates),
+                'culled_fraction': (n - len(candidates)) / n if n else 0.0,
+            }
+        else:
+            candidates = np.arange(len(self.points))
+        
+        if vectorized:
+            self.vertices = self._quickhull_vectorized(candidates)
+        else:
+            self.vertices = self._quickhull(candidates.tolist())
         self._compute_additional_properties()
     
+    def _set_points(self, points, **options):
+        """Store the input points and reset the derived state."""
+        self.points = np.asarray(points)
+        self._options = options
+        # Position of every row of points in the input stream; None while
+        # points is the whole input (see partial_fit)
+        self.input_indices = None
+        self.n_seen = len(self.points)
+        self._x = self.points[:, 0]
+        self._y = self.points[:, 1]
+        self.prefilter_stats = None
+    
     def _line_side(self, point, line_start, line_end):
         """
         Determine which side of a line a point is on.
         Returns positive value if point is on left side,
-        negative if on right side, zero if on the line.
+        negative if on right side, zero if on the line. The sign is exact,
+        also for (nearly) collinear points.
         """
-        return ((line_end[0] - line_start[0]) * (point[1] - line_start[1]) - 
-                (line_end[1] - line_start[1]) * (point[0] - line_start[0]))
+        return orient2d(line_start, line_end, point)
     
-    def _find_hull(self, points, p1, p2, side):
+    def _find_hull(self, indices, p1, p2, side):
         """
         Recursive function to find points in the convex hull.
         
         Parameters:
-        points (array): Set of points to check
-        p1, p2: Two points defining the line
+        indices (list): Indices of the points to check
+        p1, p2 (int): Indices of the two points defining the line
         side: Side to search for points
         
-        Returns list of points in the convex hull
+        Returns list of vertex indices in the convex hull
         """
-        if len(points) == 0:
+        if len(indices) == 0:
             return []
         
+        points = self.points
+        
         # Find point furthest from the line
         max_dist = 0
-        max_point_idx = -1
-        for i, point in enumerate(points):
-            dist = abs(self._line_side(point, p1, p2))
+        max_point = -1
+        for i in indices:
+            dist = abs(self._line_side(points[i], points[p1], points[p2]))
             if dist > max_dist:
                 max_dist = dist
-                max_point_idx = i
+                max_point = i
         
-        if max_point_idx == -1:
+        if max_point == -1:
             return []
         
-        max_point = points[max_point_idx]
-        
         # Recursively find points on the left and right side of lines
         # formed by max_point and the original line endpoints
-        points_left_1 = [p for p in points if self._line_side(p, p1, max_point) > 0]
-        points_left_2 = [p for p in points if self._line_side(p, max_point, p2) > 0]
+        indices_left_1 = [i for i in indices if self._line_side(points[i], points[p1], points[max_point]) > 0]
+        indices_left_2 = [i for i in indices if self._line_side(points[i], points[max_point], points[p2]) > 0]
         
-        hull_1 = self._find_hull(points_left_1, p1, max_point, side)
-        hull_2 = self._find_hull(points_left_2, max_point, p2, side)
+        hull_1 = self._find_hull(indices_left_1, p1, max_point, side)
+        hull_2 = self._find_hull(indices_left_2, max_point, p2, side)
         
         return hull_1 + [max_point] + hull_2
     
-    def _quickhull(self):
+    def _quickhull(self, candidates):
         """
         Main QuickHull algorithm implementation.
         
+        Parameters:
+        candidates (list): Indices of the points that may be hull vertices,
+            in increasing order
+        
         Returns array of vertex indices
         """
+        points = self.points
+        
         # Find leftmost and rightmost points
-        left_point = self.points[np.argmin(self.points[:, 0])]
-        right_point = self.points[np.argmax(self.points[:, 0])]
+        left = candidates[int(np.argmin(points[candidates, 0]))]
+        right = candidates[int(np.argmax(points[candidates, 0]))]
+        
+        # All points share the same x-coordinate: the hull degenerates to
+        # the vertical segment between the lowest and the highest point
+        if left == right:
+            left = candidates[int(np.argmin(points[candidates, 1]))]
+            right = candidates[int(np.argmax(points[candidates, 1]))]
+            return np.array([left] if left == right else [left, right])
         
         # Divide points into two sets
-        points_above = [p for p in self.points if self._line_side(p, left_point, right_point) > 0]
-        points_below = [p for p in self.points if self._line_side(p, left_point, right_point) < 0]
+        indices_above = [i for i in candidates if self._line_side(points[i], points[left], points[right]) > 0]
+        indices_below = [i for i in candidates if self._line_side(points[i], points[left], points[right]) < 0]
+        
+        # Find hull points. The recursion carries indices, and every point it
+        # returns lies strictly on one side of a line, so no duplicates can
+        # appear and no coordinate search is needed to recover the indices.
+        hull_above = self._find_hull(indices_above, left, right, 1)
+        hull_below = self._find_hull(indices_below, right, left, -1)
+        
+        return np.array([left] + hull_above + [right] + hull_below)
+    
+    def _line_side_vectorized(self, indices, start, end):
+        """
+        Vectorized version of _line_side.
+        Evaluates the side of the line (start, end) for every point in
+        indices with a single cross-product over the index array.
+        """
+        return orient2d_batch(self._x[start], self._y[start], self._x[end], self._y[end],
+                              self._x[indices], self._y[indices])
+
+    def _find_hull_vectorized(self, indices, start, end):
+        """
+        Vectorized counterpart of _find_hull working on point indices.
         
-        # Find hull points
-        hull_above = self._find_hull(points_above, left_point, right_point, 1)
-        hull_below = self._find_hull(points_below, right_point, left_point, -1)
+        Uses an explicit work stack instead of recursion, so inputs where
+        almost every point is on the hull (e.g. points on a circle) never
+        hit the interpreter recursion limit. Sub-problems of at most
+        SMALL_SUBPROBLEM points are finished with plain Python arithmetic,
+        where the per-call cost of NumPy would dominate.
         
-        # Combine and find indices
-        hull_points = [left_point] + hull_above + [right_point] + hull_below
+        Parameters:
+        indices (numpy.ndarray): Indices of the points left of (start, end)
+        start, end (int): Indices of the two points defining the line
         
-        # Remove duplicates while preserving order
-        unique_hull_points = []
-        for point in hull_points:
-            # Use numpy's array comparison to check for duplicates
-            if not any(np.array_equal(point, existing) for existing in unique_hull_points):
-                unique_hull_points.append(point)
+        Returns list of vertex indices in the convex hull
+        """
+        x, y = self._x, self._y
+        hull = []
         
-        # Convert back to indices
-        hull_indices = [np.where((self.points == point).all(axis=1))[0][0] for point in unique_hull_points]
+        # Work items are (indices, start, end, errbound) with the line
+        # endpoints given as (index, x, y) tuples; (None, vertex, None, None)
+        # marks a vertex to emit. Items are pushed right part first so that the
+        # hull comes out in the same order as the recursive implementation.
+        start = (start, x[start].item(), y[start].item())
+        end = (end, x[end].item(), y[end].item())
+        stack = [(indices, start, end, None)] if len(indices) else []
+        while stack:
+            indices, start, end, errbound = stack.pop()
+            if indices is None:
+                hull.append(start[0])
+                continue
+            
+            if isinstance(indices, np.ndarray) and len(indices) > self.SMALL_SUBPROBLEM:
+                # Find point furthest from the line (first one on ties, like _find_hull)
+                dist = self._line_side_vectorized(indices, start[0], end[0])
+                i = indices[np.argmax(dist)]
+                max_point = (int(i), x[i].item(), y[i].item())
+                
+                # Keep only the points outside the triangle (start, max_point, end)
+                indices_left_1 = indices[self._line_side_vectorized(indices, start[0], i) > 0]
+                indices_left_2 = indices[self._line_side_vectorized(indices, i, end[0]) > 0]
+            else:
+                if isinstance(indices, np.ndarray):
+                    xs, ys = x[indices].tolist(), y[indices].tolist()
+                    indices = list(zip(indices.tolist(), xs, ys))
+                    # Every later test of this sub-problem involves only its
+                    # points and line endpoints, so the orient2d error bound
+                    # for the whole bounding box holds for all of them; twice
+                    # the bound covers the rounding of width and height
+                    width = max(max(xs), start[1], end[1]) - min(min(xs), start[1], end[1])
+                    height = max(max(ys), start[2], end[2]) - min(min(ys), start[2], end[2])
+                    errbound = 4 * CCW_ERRBOUND * width * height
+                
+                # Float orientations, with orient2d_xy only for the results
+                # within the error bound
+                _, x0, y0 = start
+                _, x1, y1 = end
+                max_dist = 0
+                for point in indices:
+                    _, px, py = point
+                    dist = (x0 - px) * (y1 - py) - (y0 - py) * (x1 - px)
+                    if -errbound < dist < errbound:
+                        dist = orient2d_xy(x0, y0, x1, y1, px, py)
+                    if dist > max_dist:
+                        max_dist = dist
+                        max_point = point
+                
+                _, xm, ym = max_point
+                indices_left_1 = []
+                indices_left_2 = []
+                for point in indices:
+                    if point is max_point:
+                        continue
+                    _, px, py = point
+                    side = (x0 - px) * (ym - py) - (y0 - py) * (xm - px)
+                    if -errbound < side < errbound:
+                        side = orient2d_xy(x0, y0, xm, ym, px, py)
+                    if side > 0:
+                        indices_left_1.append(point)
+                    side = (xm - px) * (y1 - py) - (ym - py) * (x1 - px)
+                    if -errbound < side < errbound:
+                        side = orient2d_xy(xm, ym, x1, y1, px, py)
+                    if side > 0:
+                        indices_left_2.append(point)
+            
+            if len(indices_left_2):
+                stack.append((indices_left_2, max_point, end, errbound))
+            stack.append((None, max_point, None, None))
+            if len(indices_left_1):
+                stack.append((indices_left_1, start, max_point, errbound))
         
-        return np.array(hull_indices)
-    
+        return hull
+
+    def _quickhull_vectorized(self, candidates):
+        """
+        QuickHull where every recursion level partitions an index array
+        with boolean masks.
+        
+        Parameters:
+        candidates (numpy.ndarray): Indices of the points that may be hull
+            vertices, in increasing order
+        
+        Returns array of vertex indices, in the same order as _quickhull
+        """
+        left = int(candidates[np.argmin(self._x[candidates])])
+        right = int(candidates[np.argmax(self._x[candidates])])
+        if left == right:
+            # Vertical segment, as in _quickhull
+            left = int(candidates[np.argmin(self._y[candidates])])
+            right = int(candidates[np.argmax(self._y[candidates])])
+            return np.array([left] if left == right else [left, right])
+        
+        side = self._line_side_vectorized(candidates, left, right)
+        
+        hull_above = self._find_hull_vectorized(candidates[side > 0], left, right)
+        hull_below = self._find_hull_vectorized(candidates[side < 0], right, left)
+        
+        return np.array([left] + hull_above + [right] + hull_below)
+
+    def _akl_toussaint_filter(self):
+        """
+        Akl-Toussaint heuristic: the extreme points along x, y, x+y and x-y
+        span an octagon inside the hull, so every point strictly inside it
+        can be discarded before QuickHull starts.
+        
+        Returns array of the remaining point indices, in increasing order
+        """
+        x, y = self._x, self._y
+        x_plus_y = x + y
+        x_minus_y = x - y
+        
+        # Extreme points in counter-clockwise order, starting from the leftmost
+        extremes = [np.argmin(x), np.argmin(x_plus_y), np.argmin(y), np.argmax(x_minus_y),
+                    np.argmax(x), np.argmax(x_plus_y), np.argmax(y), np.argmin(x_minus_y)]
+        
+        # A point can be extreme in several directions; drop repeated corners
+        # so that every edge of the octagon has a non-zero length
+        octagon = []
+        for i in extremes:
+            if not octagon or not np.array_equal(self.points[i], self.points[octagon[-1]]):
+                octagon.append(int(i))
+        while len(octagon) > 1 and np.array_equal(self.points[octagon[0]], self.points[octagon[-1]]):
+            octagon.pop()
+        
+        if len(octagon) < 3:
+            return np.arange(len(self.points))
+        
+        # The side of a point p of the edge a -> b is the affine function
+        # u * py - v * px + c of p, so one matrix product gives the sides of
+        # a block of points for all edges at once, in an array (edges, points)
+        corners = np.asarray(self.points[octagon], dtype=float)
+        u, v = (np.roll(corners, -1, axis=0) - corners).T
+        normals = np.column_stack([-v, u])
+        offsets = v * corners[:, 0] - u * corners[:, 1]
+        # Rounding moves every side by less than margin. Points closer to an
+        # edge than that are kept, so no hull vertex can be culled.
+        scale = max(float(np.abs(self._x).max()), float(np.abs(self._y).max()))
+        margin = 32 * EPSILON * (np.abs(u) + np.abs(v)) * scale
+        threshold = (margin - offsets)[:, None]
+        
+        n = len(self.points)
+        keep = np.empty(n, dtype=bool)
+        for first in range(0, n, self.PREFILTER_CHUNK):
+            block = np.asarray(self.points[first:first + self.PREFILTER_CHUNK], dtype=float)
+            inside = (normals @ block.T > threshold).all(axis=0)
+            np.logical_not(inside, out=keep[first:first + len(block)])
+        
+        return np.flatnonzero(keep)
+
     def _compute_additional_properties(self):
         """
         Compute additional properties similar to scipy's ConvexHull
@@ -108,6 +334,316 @@ class ConvexHull_QuickHull:
         y = self.points[self.vertices, 1]
         self.area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
         
+    @classmethod
+    def from_chunks(cls, source, chunk_size=10**6, vectorized=True, prefilter=True):
+        """
+        Compute the convex hull of a point set that does not fit in memory.
+        
+        The input is read one chunk at a time and only the vertices of the
+        running hull are kept, so peak memory grows with chunk_size plus the
+        hull size rather than with the number of points.
+        
+        Parameters:
+        source: Path to a .npy file (opened memory-mapped), an array-like of
+            shape (n, 2) such as np.memmap, or an iterable of (k, 2) chunks
+        chunk_size (int): Number of points read at once from a file or array
+        vectorized, prefilter (bool): Passed to the hull of every chunk
+        
+        Returns a hull whose points are the hull vertices only; see partial_fit
+        """
+        if isinstance(source, (str, os.PathLike)):
+            source = np.load(source, mmap_mode='r')
+        if hasattr(source, 'shape'):
+            chunks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+        else:
+            chunks = iter(source)
+        
+        hull = None
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            if hull is None:
+                hull = cls(chunk, vectorized=vectorized, prefilter=prefilter)
+                hull.partial_fit(np.empty((0, 2), dtype=hull.points.dtype))
+            else:
+                hull.partial_fit(chunk)
+        
+        if hull is None:
+            raise ValueError("Cannot compute the convex hull of an empty input")
+        return hull
+    
+    @classmethod
+    def parallel(cls, points, workers=None, prefilter=True):
+        """
+        Compute the convex hull on several processes.
+        
+        The points are copied once into a shared memory block and every worker
+        computes the hull of a contiguous slice of it with the vectorized
+        QuickHull, so no points are pickled. The local hulls are then merged
+        pairwise with _merge_convex_hulls, in time linear in their size.
+        
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+        workers (int): Number of processes, defaults to os.cpu_count()
+        prefilter (bool): Use the Akl-Toussaint prefilter in every worker
+        
+        Returns hull of the points, with the vertices in clockwise order
+        """
+        points = np.ascontiguousarray(points)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(points) < 2 * workers:
+            return cls(points, vectorized=True, prefilter=prefilter)
+        
+        shm = shared_memory.SharedMemory(create=True, size=points.nbytes)
+        try:
+            shared = np.ndarray(points.shape, dtype=points.dtype, buffer=shm.buf)
+            shared[:] = points
+            del shared
+            
+            bounds = np.linspace(0, len(points), workers + 1).astype(int)
+            tasks = [(shm.name, points.shape, points.dtype.str, start, stop, prefilter)
+                     for start, stop in zip(bounds[:-1], bounds[1:])]
+            with Pool(workers) as pool:
+                results = pool.map(_shared_slice_hull, tasks)
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        vertices = reduce(lambda a, b: _merge_convex_hulls(points, a, b),
+                          [local_vertices for local_vertices, _ in results])
+        
+        hull = cls.__new__(cls)
+        hull._set_points(points, vectorized=True, prefilter=prefilter)
+        for _, stats in results:
+            hull._merge_prefilter_stats(stats)
+        hull.vertices = vertices
+        hull._compute_additional_properties()
+        return hull
+    
+    @classmethod
+    def batch(cls, coords, offsets):
+        """
+        Compute the convex hulls of many point sets in one call.
+        
+        Set i is coords[offsets[i]:offsets[i + 1]]. Sets of up to
+        SMALL_BATCH_SET points are grouped by size and solved together with
+        array operations (see _small_hulls), so thousands of tiny hulls avoid
+        the per-object overhead of constructing a hull each. Larger sets use
+        the vectorized QuickHull.
+        
+        Parameters:
+        coords (numpy.ndarray): Points of all sets, shape (n, 2)
+        offsets (numpy.ndarray): Start of every set in coords followed by n,
+            shape (m + 1,)
+        
+        Returns (vertices, vertex_offsets): hull i is
+        vertices[vertex_offsets[i]:vertex_offsets[i + 1]], given as indices
+        into coords in clockwise order starting from the leftmost point
+        """
+        coords = np.asarray(coords)
+        offsets = np.asarray(offsets, dtype=np.intp)
+        sizes = np.diff(offsets)
+        counts = np.zeros(len(sizes), dtype=np.intp)
+        # (set numbers, hull vertex rows, number of valid entries per row)
+        results = []
+        
+        for size in np.unique(sizes):
+            sets = np.flatnonzero(sizes == size)
+            if size == 0:
+                continue
+            if size <= cls.SMALL_BATCH_SET:
+                # Split large groups so the (sets, size, size, size) arrays stay small
+                block = max(1, 2**20 // size**3)
+                for first in range(0, len(sets), block):
+                    group = sets[first:first + block]
+                    indices = offsets[group][:, None] + np.arange(size)
+                    local, group_counts = _small_hulls(coords[indices])
+                    counts[group] = group_counts
+                    rows = np.take_along_axis(indices, local, axis=1)
+                    results.append((group, rows, group_counts))
+            else:
+                for i in sets:
+                    hull = cls(coords[offsets[i]:offsets[i + 1]], vectorized=True)
+                    counts[i] = len(hull)
+                    results.append(([i], (offsets[i] + hull.vertices)[None], [len(hull)]))
+        
+        vertex_offsets = np.zeros(len(sizes) + 1, dtype=np.intp)
+        np.cumsum(counts, out=vertex_offsets[1:])
+        vertices = np.empty(vertex_offsets[-1], dtype=np.intp)
+        for group, rows, group_counts in results:
+            columns = np.arange(rows.shape[1])
+            valid = columns < np.asarray(group_counts)[:, None]
+            positions = vertex_offsets[group][:, None] + columns
+            vertices[positions[valid]] = rows[valid]
+        return vertices, vertex_offsets
+    
+    def partial_fit(self, chunk):
+        """
+        Merge the next chunk of points into the hull.
+        
+        The hull of the chunk is computed on its own and merged with the
+        current vertices. Afterwards points holds only the hull vertices (in
+        hull order, so vertices is simply 0..h-1), input_indices gives the
+        position of each of them in the whole stream and n_seen counts the
+        points consumed so far.
+        
+        Parameters:
+        chunk (numpy.ndarray): Array of points with shape (k, 2)
+        
+        Returns self
+        """
+        chunk = np.asarray(chunk)
+        if self.input_indices is None:
+            self.input_indices = self.vertices.copy()
+            self.points = self.points[self.vertices]
+            self.vertices = np.arange(len(self.points))
+        
+        kept_points = self.points[self.vertices]
+        kept_indices = self.input_indices[self.vertices]
+        if len(chunk):
+            chunk_hull = ConvexHull_QuickHull(chunk, **self._options)
+            self._merge_prefilter_stats(chunk_hull.prefilter_stats)
+            kept_points = np.concatenate([kept_points, chunk[chunk_hull.vertices]])
+            kept_indices = np.concatenate([kept_indices, self.n_seen + chunk_hull.vertices])
+            self.n_seen += len(chunk)
+        
+        merged = ConvexHull_QuickHull(kept_points, vectorized=self._options['vectorized'])
+        self.points = kept_points[merged.vertices]
+        self.input_indices = kept_indices[merged.vertices]
+        self.vertices = np.arange(len(self.points))
+        self._x = self.points[:, 0]
+        self._y = self.points[:, 1]
+        self._compute_additional_properties()
+        return self
+    
+    def _merge_prefilter_stats(self, stats):
+        """Accumulate the prefilter statistics of a streamed chunk."""
+        if stats is None:
+            return
+        if self.prefilter_stats is None:
+            self.prefilter_stats = {'total': 0, 'culled': 0, 'remaining': 0}
+        for key in ('total', 'culled', 'remaining'):
+            self.prefilter_stats[key] += stats[key]
+        total = self.prefilter_stats['total']
+        self.prefilter_stats['culled_fraction'] = self.prefilter_stats['culled'] / total if total else 0.0
+    
     def __len__(self):
         """Return number of vertices in convex hull"""
         return len(self.vertices)
+
+
+def _shared_slice_hull(task):
+    """
+    Worker for ConvexHull_QuickHull.parallel: hull of points[start:stop]
+    read from the shared memory block.
+    
+    Returns (global vertex indices, prefilter statistics)
+    """
+    name, shape, dtype, start, stop, prefilter = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        points = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        hull = ConvexHull_QuickHull(points[start:stop], vectorized=True, prefilter=prefilter)
+        result = (start + hull.vertices, hull.prefilter_stats)
+        # The views must be released before the block can be closed
+        del hull, points
+        return result
+    finally:
+        shm.close()
+
+
+def _small_hulls(points):
+    """
+    Convex hulls of many small point sets of the same size at once.
+    
+    For sets of k points every ordered pair (i, j) is tested as a clockwise
+    hull edge: all other points must lie to the right of i -> j or on the
+    segment itself. This costs O(k^3) per set but runs as a handful of array
+    operations over all sets together. Duplicated points only count once and
+    points in the middle of an edge are not vertices, as in QuickHull.
+    
+    Parameters:
+    points (numpy.ndarray): Array with shape (m, k, 2)
+    
+    Returns (vertices, counts): vertices has shape (m, k) and row s holds the
+    hull of set s in its first counts[s] entries, as local indices in
+    clockwise order starting from the leftmost (then lowest) point
+    """
+    m, k, _ = points.shape
+    x, y = points[..., 0], points[..., 1]
+    
+    # Only the first copy of a repeated point may become a vertex
+    same = (x[:, :, None] == x[:, None, :]) & (y[:, :, None] == y[:, None, :])
+    unique = ~np.tril(same, -1).any(axis=2)
+    
+    # cross[s, i, j, l] is the side of point l relative to the line i -> j
+    cross = orient2d_batch(x[:, :, None, None], y[:, :, None, None],
+                           x[:, None, :, None], y[:, None, :, None],
+                           x[:, None, None, :], y[:, None, None, :])
+    dx = x[:, None, :] - x[:, :, None]
+    dy = y[:, None, :] - y[:, :, None]
+    # Collinear points must lie between i and j: 0 <= (l - i).(j - i) <= |j - i|^2
+    dot = dx[:, :, :, None] * dx[:, :, None, :] + dy[:, :, :, None] * dy[:, :, None, :]
+    length = dx * dx + dy * dy
+    on_segment = (dot >= 0) & (dot <= length[:, :, :, None])
+    
+    is_edge = ((cross < 0) | ((cross == 0) & on_segment)).all(axis=3)
+    is_edge &= unique[:, :, None] & unique[:, None, :] & (length > 0)
+    
+    has_edge = is_edge.any(axis=2)
+    successor = np.argmax(is_edge, axis=2)
+    counts = np.maximum(has_edge.sum(axis=1), 1)
+    
+    # Walk the successor links from the lexicographically smallest point
+    order = np.lexsort((y, x), axis=1)
+    rows = np.arange(m)
+    vertices = np.empty((m, k), dtype=np.intp)
+    vertices[:, 0] = order[:, 0]
+    for step in range(1, k):
+        vertices[:, step] = successor[rows, vertices[:, step - 1]]
+    return vertices, counts
+
+
+def _lexicographic_vertices(points, hull):
+    """
+    Sort the vertices of a convex polygon by (x, y) in linear time, by
+    merging its two chains between the smallest and the largest vertex.
+    """
+    hull = list(hull)
+    key = [tuple(points[i].tolist()) for i in hull]
+    h = len(hull)
+    low = min(range(h), key=key.__getitem__)
+    high = max(range(h), key=key.__getitem__)
+    
+    chain_1 = [(key[i % h], hull[i % h]) for i in range(low, low + (high - low) % h + 1)]
+    chain_2 = [(key[i % h], hull[i % h]) for i in range(low, low - (low - high) % h - 1, -1)]
+    return list(heapq.merge(chain_1, chain_2[1:-1]))
+
+
+def _merge_convex_hulls(points, hull_a, hull_b):
+    """
+    Convex hull of the union of two convex polygons in O(h).
+    
+    Both vertex lists are sorted by (x, y) in linear time and merged, and
+    Andrew's monotone chain runs over the merged sequence.
+    
+    Returns array of vertex indices, clockwise from the lowest leftmost point
+    """
+    ordered = []
+    for item in heapq.merge(_lexicographic_vertices(points, hull_a),
+                            _lexicographic_vertices(points, hull_b)):
+        if not ordered or item[0] != ordered[-1][0]:
+            ordered.append(item)
+    if len(ordered) < 3:
+        return np.array([i for _, i in ordered])
+    
+    upper, lower = [], []
+    for item in ordered:
+        while len(upper) >= 2 and orient2d(upper[-2][0], upper[-1][0], item[0]) >= 0:
+            upper.pop()
+        upper.append(item)
+        while len(lower) >= 2 and orient2d(lower[-2][0], lower[-1][0], item[0]) <= 0:
+            lower.pop()
+        lower.append(item)
+    
+    return np.array([i for _, i in upper + lower[-2:0:-1]])
@@ -0,0 +1,205 @@
+import numpy as np
+from bisect import bisect_right
+from convexhull_quickhull_implementation import ConvexHull_QuickHull, _merge_convex_hulls
+
+
+class DynamicConvexHull:
+    """
+    Convex hull of a point set that supports insertions, deletions and moves.
+
+    The points are kept sorted by (x, y) in blocks of about block_size
+    points. A complete binary tree is built over the blocks, in the spirit of
+    Overmars and van Leeuwen: every leaf stores the hull of its block and
+    every internal node the hull of its two children, merged in linear time.
+    An update recomputes the hull of one block with QuickHull and then only
+    the O(log(n / block_size)) merges on the path to the root.
+
+    Attributes:
+    points (numpy.ndarray): Coordinates of the points; rows of deleted points
+        are reused by later insertions
+    vertices (numpy.ndarray): Indices into points of the hull vertices, in
+        clockwise order
+    area (float): Area of the hull
+    """
+
+    def __init__(self, points=(), block_size=256):
+        """
+        Parameters:
+        points (numpy.ndarray): Initial points with shape (n, 2)
+        block_size (int): Number of points per leaf block
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.block_size = block_size
+        self.points = np.empty((max(len(points), 16), 2))
+        self.points[:len(points)] = points
+        self._used = len(points)
+        self._free = []
+        self._build(np.arange(len(points)))
+
+    def insert(self, point):
+        """
+        Add a point to the set.
+
+        Returns the index of the point in points
+        """
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self._used == len(self.points):
+                self.points = np.concatenate([self.points, np.empty_like(self.points)])
+            index = self._used
+            self._used += 1
+        self.points[index] = point
+
+        block = self._find_block(point)
+        self._blocks[block] = np.append(self._blocks[block], index)
+        if len(self._blocks[block]) > 2 * self.block_size:
+            self._split_block(block)
+        else:
+            self._update_block(block)
+        return index
+
+    def delete(self, point):
+        """
+        Remove a point from the set. Raises ValueError if it is not present.
+        """
+        block, position = self._locate(point)
+        index = self._blocks[block][position]
+        self._blocks[block] = np.delete(self._blocks[block], position)
+        self._free.append(index)
+        self._update_block(block)
+
+    def move(self, point, new_point):
+        """
+        Move a point to new coordinates; it keeps its index in points.
+
+        Returns the index of the point in points
+        """
+        block, position = self._locate(point)
+        index = self._blocks[block][position]
+        self.points[index] = new_point
+
+        new_block = self._find_block(new_point)
+        if new_block == block:
+            self._update_block(block)
+            return index
+
+        self._blocks[block] = np.delete(self._blocks[block], position)
+        self._update_block(block)
+        self._blocks[new_block] = np.append(self._blocks[new_block], index)
+        if len(self._blocks[new_block]) > 2 * self.block_size:
+            self._split_block(new_block)
+        else:
+            self._update_block(new_block)
+        return index
+
+    def __len__(self):
+        """Return number of vertices in convex hull"""
+        return len(self.vertices)
+
+    def _build(self, indices):
+        """Sort the points into blocks and build the whole tree."""
+        coords = self.points[indices]
+        indices = indices[np.lexsort((coords[:, 1], coords[:, 0]))]
+        self._blocks = [indices[i:i + self.block_size]
+                        for i in range(0, len(indices), self.block_size)] or [indices]
+        # Block i holds the keys from _starts[i] up to _starts[i + 1]; the
+        # first block is unbounded below. The bounds stay fixed until a block
+        # is split, even if it runs empty.
+        self._starts = [None] + [tuple(self.points[block[0]].tolist()) for block in self._blocks[1:]]
+
+        offsets = np.append(np.arange(0, len(indices), self.block_size), len(indices))
+        if len(indices) == 0:
+            offsets = np.array([0, 0])
+        vertices, vertex_offsets = ConvexHull_QuickHull.batch(self.points[indices], offsets)
+        leaves = [indices[vertices[start:stop]]
+                  for start, stop in zip(vertex_offsets[:-1], vertex_offsets[1:])]
+        self._build_tree(leaves)
+
+    def _build_tree(self, leaves):
+        """Build the levels above the given leaf hulls."""
+        self._levels = [leaves]
+        while len(self._levels[-1]) > 1:
+            below = self._levels[-1]
+            self._levels.append([self._merge(below[i], below[i + 1] if i + 1 < len(below) else None)
+                                 for i in range(0, len(below), 2)])
+        self._refresh()
+
+    def _merge(self, hull_a, hull_b):
+        """Hull of the union of two hulls given as vertex index arrays."""
+        if hull_b is None or len(hull_b) == 0:
+            return hull_a
+        if len(hull_a) == 0:
+            return hull_b
+        return _merge_convex_hulls(self.points, hull_a, hull_b)
+
+    def _update_block(self, block):
+        """Recompute the hull of one block and the merges above it."""
+        indices = self._blocks[block]
+        if len(indices):
+            leaf = indices[ConvexHull_QuickHull(self.points[indices], vectorized=True).vertices]
+        else:
+            leaf = indices
+        self._levels[0][block] = leaf
+
+        position = block
+        for level in range(1, len(self._levels)):
+            position //= 2
+            below = self._levels[level - 1]
+            right = below[2 * position + 1] if 2 * position + 1 < len(below) else None
+            self._levels[level][position] = self._merge(below[2 * position], right)
+        self._refresh()
+
+    def _split_block(self, block):
+        """Split an overfull block in two and rebuild the tree levels."""
+        indices = self._blocks[block]
+        coords = self.points[indices]
+        indices = indices[np.lexsort((coords[:, 1], coords[:, 0]))]
+        half = len(indices) // 2
+        self._blocks[block:block + 1] = [indices[:half], indices[half:]]
+        self._starts.insert(block + 1, tuple(self.points[indices[half]].tolist()))
+
+        leaves = self._levels[0]
+        leaves[block:block + 1] = [None, None]
+        for i in (block, block + 1):
+            part = self._blocks[i]
+            leaves[i] = part[ConvexHull_QuickHull(self.points[part], vectorized=True).vertices]
+        self._build_tree(leaves)
+
+    def _find_block(self, point):
+        """Index of the block whose (x, y) range contains point."""
+        key = (float(point[0]), float(point[1]))
+        return max(bisect_right(self._starts, key, lo=1) - 1, 0)
+
+    def _locate(self, point):
+        """Return (block, position in block) of a point given by its coordinates."""
+        point = np.asarray(point, dtype=float)
+        for block in self._candidate_blocks(point):
+            indices = self._blocks[block]
+            found = np.flatnonzero((self.points[indices] == point).all(axis=1))
+            if len(found):
+                return block, found[0]
+        raise ValueError(f"Point {tuple(point.tolist())} is not in the hull point set")
+
+    def _candidate_blocks(self, point):
+        """Blocks that may hold a point, nearest to its (x, y) position first."""
+        block = self._find_block(point)
+        yield block
+        # Copies of one point may straddle block boundaries, so fall back to
+        # the neighbours and finally to all blocks
+        for other in (block - 1, block + 1):
+            if 0 <= other < len(self._blocks):
+                yield other
+        for other in range(len(self._blocks)):
+            if abs(other - block) > 1:
+                yield other
+
+    def _refresh(self):
+        """Update vertices and area from the root of the tree."""
+        self.vertices = np.asarray(self._levels[-1][0], dtype=np.intp)
+        if len(self.vertices) < 3:
+            self.area = 0.0
+            return
+        x = self.points[self.vertices, 0]
+        y = self.points[self.vertices, 1]
+        self.area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
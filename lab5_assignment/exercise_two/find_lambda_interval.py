@@ -1,55 +1,62 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+from convex_polygon import ConvexPolygon
 from matplotlib.animation import FuncAnimation
 
 # Define the points A, B, C, D and the function to compute M for a given lambda
 def get_point_M(lambda_value):
     return np.array([-2 + lambda_value, 3 - lambda_value])
 
-# Function to determine if M is inside the square
-def is_point_inside_square(lambda_value):
-    points = np.array([
-        [3, -3],  # A
-        [3, 3],   # B
-        [-3, -3], # C
-        [-3, 3],  # D
-    ])
-    M = get_point_M(lambda_value)
-    points = np.vstack([points, M])
-    hull = ConvexHull(points)
-    return len(hull.vertices) == 4
-
-# Initialize the plot
-fig, ax = plt.subplots(figsize=(8, 8))
 square_points = np.array([
     [3, -3],  # A
     [3, 3],   # B
     [-3, -3], # C
     [-3, 3],  # D
 ])
+square = ConvexPolygon(ConvexHull(square_points))
+
+# Initialize the plot
+fig, ax = plt.subplots(figsize=(8, 8))
 interval = None
 last_inside = False
 
+# Exact interval: M(λ) = M(0) + λ·(1, -1) moves on a line, so intersect that
+# line with the edges of the square instead of sampling λ
+exact_interval = square.trajectory_interval(get_point_M(0), get_point_M(1) - get_point_M(0))
+print(f"Exact interval where M is inside the square: λ ∈ [{exact_interval[0]:.2f}, {exact_interval[1]:.2f}]")
+
+lambda_values = np.linspace(-10, 10, 200)
+
+# Compute the hulls of all frames in a single batch call
+frame_points = np.stack([np.vstack([square_points, get_point_M(l)]) for l in lambda_values])
+frame_size = frame_points.shape[1]
+frame_vertices, frame_offsets = ConvexHull.batch(
+    frame_points.reshape(-1, 2), np.arange(len(lambda_values) + 1) * frame_size)
+# M is inside the square when it is not outside; the boundary counts as inside
+frame_inside = square.locate(frame_points[:, -1]) != ConvexPolygon.OUTSIDE
+
 # Animation function
-def update(lambda_value):
+def update(frame):
     global interval, last_inside
     ax.clear()
+    lambda_value = lambda_values[frame]
     M = get_point_M(lambda_value)
-    points = np.vstack([square_points, M])
-    hull = ConvexHull(points)
+    points = frame_points[frame]
+    vertices = frame_vertices[frame_offsets[frame]:frame_offsets[frame + 1]] - frame * frame_size
+    simplices = np.column_stack([vertices, np.roll(vertices, -1)])
     ax.plot(square_points[:, 0], square_points[:, 1], 'bo', label="Square Points")
     ax.plot(M[0], M[1], 'ro', label=f"M (-2 + λ, 3 - λ)")
-    for simplex in hull.simplices:
+    for simplex in simplices:
         ax.plot(points[simplex, 0], points[simplex, 1], 'k-', label="Convex Hull" if simplex[0] == 0 else "")
-    ax.plot(points[hull.vertices, 0], points[hull.vertices, 1], 'go', label="Hull Vertices")
+    ax.plot(points[vertices, 0], points[vertices, 1], 'go', label="Hull Vertices")
     labels = ['A', 'B', 'C', 'D', 'M']
     for i, point in enumerate(points):
         ax.annotate(labels[i], (point[0] + 0.15, point[1] + 0.15), fontsize=10)
     ax.set_xlabel("X", fontsize=12)
     ax.set_ylabel("Y", fontsize=12)
     ax.set_title(f"Convex Hull for λ = {lambda_value:.2f}", fontsize=14)
-    inside = is_point_inside_square(lambda_value)
+    inside = frame_inside[frame]
     if inside:
         ax.text(0, -4.5, "M is Inside the Square", color="green", fontsize=12, ha="center")
     else:
@@ -70,7 +77,6 @@ def update(lambda_value):
     ax.set_ylim(-5, 5)
     ax.set_aspect('equal')
 
-lambda_values = np.linspace(-10, 10, 200)
-ani = FuncAnimation(fig, update, frames=lambda_values, interval=50, repeat=False)
+ani = FuncAnimation(fig, update, frames=len(lambda_values), interval=50, repeat=False)
 ani.save("lambda_point_M.gif", dpi=150, fps=60)
 plt.show()
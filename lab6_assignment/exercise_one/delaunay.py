@@ -0,0 +1,207 @@
+import os
+import sys
+import math
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d, incircle
+
+# Vertex index of the point at infinity; triangle (u, v, INFINITE) is the
+# ghost triangle outside the convex hull edge from u to v
+INFINITE = -1
+
+
+def _insertion_order(points, indices):
+    """
+    Order the points row by row over a grid of about sqrt(n) rows,
+    alternating direction, so that consecutive points are close together
+    and every walk to the next point is short.
+    """
+    if not indices:
+        return []
+    ys = [points[i][1] for i in indices]
+    rows = max(1, int(math.sqrt(len(indices) / 4)))
+    low = min(ys)
+    height = (max(ys) - low) / rows or 1.0
+
+    def key(i):
+        x, y = points[i]
+        row = min(int((y - low) / height), rows - 1)
+        return row, x if row % 2 == 0 else -x
+
+    return sorted(indices, key=key)
+
+
+class DelaunayTriangulation:
+    """
+    Delaunay triangulation built incrementally with the Bowyer-Watson
+    algorithm.
+
+    Every new point is located by walking from the last new triangle
+    towards it. The triangles whose circumcircle strictly contains the point
+    form a cavity, which is found by a search over triangle neighbours and
+    replaced by a fan of triangles around the new point. The outside of the
+    convex hull is covered by ghost triangles through the point at infinity,
+    so points outside the hull need no super-triangle. The points are
+    inserted along a snake through a grid of rows, which keeps the walks
+    short, so building takes about O(n log n). All decisions use the exact
+    predicates from predicates.py.
+
+    Attributes:
+    points (list): The input points as (x, y) tuples
+    triangles (list): Triangles as (i, j, k) point indices, counter-clockwise
+    """
+
+    def __init__(self, points):
+        """
+        Parameters:
+        points (list): Points as (x, y) pairs; repeated points are used once,
+            at their first index
+        """
+        self.points = [tuple(p) for p in points]
+        self._triangles = {}   # id -> (a, b, c)
+        self._owner = {}       # directed edge (u, v) -> id of the triangle holding it
+        self._next_id = 0
+
+        first = {}
+        for i, p in enumerate(self.points):
+            first.setdefault(p, i)
+        distinct = sorted(first.values())
+        seed = self._first_triangle(distinct)
+        if seed is None:
+            # Fewer than three points, or all of them on one line
+            self.triangles = []
+            return
+
+        a, b, c = seed
+        last = self._add(a, b, c)
+        self._add(b, a, INFINITE)
+        self._add(c, b, INFINITE)
+        self._add(a, c, INFINITE)
+        for i in _insertion_order(self.points, [i for i in distinct if i not in seed]):
+            last = self._insert(i, last)
+
+        self.triangles = [t for t in self._triangles.values() if INFINITE not in t]
+
+    def _first_triangle(self, distinct):
+        """Three points of distinct that are not on one line, counter-clockwise."""
+        if len(distinct) < 3:
+            return None
+        a, b = distinct[0], distinct[1]
+        for c in distinct[2:]:
+            turn = orient2d(self.points[a], self.points[b], self.points[c])
+            if turn != 0:
+                return (a, b, c) if turn > 0 else (b, a, c)
+        return None
+
+    def _add(self, a, b, c):
+        t = self._next_id
+        self._next_id += 1
+        self._triangles[t] = (a, b, c)
+        self._owner[(a, b)] = t
+        self._owner[(b, c)] = t
+        self._owner[(c, a)] = t
+        return t
+
+    def _remove(self, t):
+        a, b, c = self._triangles.pop(t)
+        del self._owner[(a, b)], self._owner[(b, c)], self._owner[(c, a)]
+
+    def _in_circle(self, t, p):
+        """True if point p lies strictly inside the circumcircle of triangle t."""
+        a, b, c = self._triangles[t]
+        points = self.points
+        if c != INFINITE:
+            return incircle(points[a], points[b], points[c], p) > 0
+        # The circle of a ghost triangle degenerates to the open half-plane
+        # outside its hull edge, plus the inside of the edge itself
+        u, v = points[a], points[b]
+        turn = orient2d(u, v, p)
+        if turn != 0:
+            return turn > 0
+        return (min(u[0], v[0]) <= p[0] <= max(u[0], v[0]) and
+                min(u[1], v[1]) <= p[1] <= max(u[1], v[1]) and p != u and p != v)
+
+    def _locate(self, p, start):
+        """A triangle whose circumcircle contains p, walking from triangle start."""
+        points = self.points
+        t = start
+        while True:
+            a, b, c = self._triangles[t]
+            if c == INFINITE:
+                return t
+            for u, v in ((a, b), (b, c), (c, a)):
+                if orient2d(points[u], points[v], p) < 0:
+                    t = self._owner[(v, u)]
+                    break
+            else:
+                return t
+
+    def _insert(self, i, start):
+        """Insert point i; returns a new triangle to start the next walk from."""
+        p = self.points[i]
+        first = self._locate(p, start)
+        cavity = {first}
+        stack = [first]
+        boundary = []
+        while stack:
+            t = stack.pop()
+            a, b, c = self._triangles[t]
+            for u, v in ((a, b), (b, c), (c, a)):
+                neighbour = self._owner[(v, u)]
+                if neighbour in cavity:
+                    continue
+                if self._in_circle(neighbour, p):
+                    cavity.add(neighbour)
+                    stack.append(neighbour)
+                else:
+                    boundary.append((u, v))
+
+        for t in cavity:
+            self._remove(t)
+        last = None
+        for u, v in boundary:
+            if u == INFINITE:
+                self._add(v, i, INFINITE)
+            elif v == INFINITE:
+                self._add(i, u, INFINITE)
+            else:
+                last = self._add(u, v, i)
+        if last is None:
+            last = next(t for t, tri in self._triangles.items() if INFINITE not in tri)
+        return last
+
+    def empty_circles(self):
+        """
+        The distinct empty circumcircles of the triangulation.
+
+        Triangles whose vertices all lie on one circle, such as the two
+        halves of a square, share their circumcircle. They are merged, so
+        each circle is reported once with every point on it.
+
+        Returns list of sorted tuples of point indices
+        """
+        parent = {t: t for t in self._triangles}
+
+        def find(t):
+            while parent[t] != t:
+                parent[t] = parent[parent[t]]
+                t = parent[t]
+            return t
+
+        for t, (a, b, c) in self._triangles.items():
+            if c == INFINITE:
+                continue
+            for u, v in ((a, b), (b, c), (c, a)):
+                neighbour = self._owner[(v, u)]
+                w = self._triangles[neighbour]
+                if INFINITE in w or neighbour < t:
+                    continue
+                opposite = next(x for x in w if x != u and x != v)
+                if incircle(self.points[a], self.points[b], self.points[c],
+                            self.points[opposite]) == 0:
+                    parent[find(neighbour)] = find(t)
+
+        circles = {}
+        for t, tri in self._triangles.items():
+            if INFINITE not in tri:
+                circles.setdefault(find(t), set()).update(tri)
+        return [tuple(sorted(circle)) for circle in circles.values()]
@@ -0,0 +1,235 @@
+import heapq
+import os
+import sys
+from fractions import Fraction
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d, orient2d_batch
+from grid import expand, segment_cells, within
+
+
+def _orient(a, b, p):
+    """
+    orient2d where p may be an intersection point with Fraction coordinates;
+    mixing them with floats would round.
+    """
+    if type(p[0]) is Fraction or type(p[1]) is Fraction:
+        ax, ay, bx, by, px, py = map(Fraction, (a[0], a[1], b[0], b[1], p[0], p[1]))
+        return (ax - px) * (by - py) - (ay - py) * (bx - px)
+    return orient2d(a, b, p)
+
+
+def _as_array(segments):
+    """Segments given as [[x1, y1], [x2, y2]] pairs or rows of 4 values, shape (m, 4)."""
+    return np.asarray(segments, dtype=float).reshape(-1, 4)
+
+
+class SegmentSet:
+    """
+    Set of segments prepared for intersection queries.
+
+    The segments are stored in an array of shape (m, 4), one row
+    (x1, y1, x2, y2) per segment. Their bounding box is split into a uniform
+    grid with about as many cells as segments, and every segment is listed
+    in the grid cells it passes through. A query segment is only tested
+    against the segments listed in its own cells, all at once with exact
+    orientation signs, so it costs about O(k) for a query that crosses k
+    cells instead of O(m).
+
+    Segments are closed: touching at an endpoint and overlapping along a
+    line both count as intersecting, as in shapely's intersects.
+    """
+
+    def __init__(self, segments, cells=None):
+        """
+        Parameters:
+        segments: Segments as [[x1, y1], [x2, y2]] pairs, or an array of shape (m, 4)
+        cells (int): Approximate number of grid cells; defaults to the
+            number of segments
+        """
+        self.segments = _as_array(segments)
+        m = len(self.segments)
+        if m == 0:
+            self.low, self.cell_size, self.shape = np.zeros(2), np.ones(2), (1, 1)
+            self._cell_segments = np.zeros(0, dtype=np.intp)
+            self._cell_starts = np.zeros(2, dtype=np.intp)
+            return
+
+        points = self.segments.reshape(-1, 2)
+        self.low = points.min(axis=0)
+        size = points.max(axis=0) - self.low
+        # A set of horizontal or vertical segments on one line has a flat box
+        size = np.where(size > 0, size, 1.0)
+        if cells is None:
+            cells = m
+        aspect = size[0] / size[1]
+        columns = min(max(1, int(round(np.sqrt(cells * aspect)))), 4 * m)
+        rows = min(max(1, int(round(np.sqrt(cells / aspect)))), 4 * m)
+        self.shape = (rows, columns)
+        self.cell_size = size / (columns, rows)
+
+        segment, cell = self._cells(self.segments)
+        order = np.argsort(cell, kind='stable')
+        self._cell_segments = segment[order]
+        self._cell_starts = np.concatenate(
+            [[0], np.cumsum(np.bincount(cell, minlength=rows * columns))])
+
+    def __len__(self):
+        """Return number of segments"""
+        return len(self.segments)
+
+    def _cells(self, segments):
+        """
+        The grid cells every segment passes through.
+
+        Returns (segment, cell): one entry for every cell of every segment
+        """
+        x1, y1, x2, y2 = segments.T
+        segment, row, column = segment_cells(x1, y1, x2, y2, self.low, self.cell_size, self.shape)
+        return segment, row * self.shape[1] + column
+
+    def candidates(self, segment):
+        """Indices of the segments that share a grid cell with segment."""
+        _, cells = self._cells(_as_array(segment))
+        _, slots = expand(self._cell_starts[cells], self._cell_starts[cells + 1] - 1)
+        return np.unique(self._cell_segments[slots])
+
+    def intersects(self, segment):
+        """
+        Indices of the segments that intersect segment.
+
+        Parameters:
+        segment: [[x1, y1], [x2, y2]] or (x1, y1, x2, y2)
+
+        Returns int array of segment indices in increasing order
+        """
+        if len(self.segments) == 0:
+            return np.zeros(0, dtype=np.intp)
+        px1, py1, px2, py2 = _as_array(segment)[0]
+        found = self.candidates(segment)
+        qx1, qy1, qx2, qy2 = self.segments[found].T
+
+        d1 = np.sign(orient2d_batch(qx1, qy1, qx2, qy2, px1, py1))
+        d2 = np.sign(orient2d_batch(qx1, qy1, qx2, qy2, px2, py2))
+        d3 = np.sign(orient2d_batch(px1, py1, px2, py2, qx1, qy1))
+        d4 = np.sign(orient2d_batch(px1, py1, px2, py2, qx2, qy2))
+        crossing = (d1 * d2 < 0) & (d3 * d4 < 0)
+        touching = (((d1 == 0) & within(qx1, qy1, qx2, qy2, px1, py1)) |
+                    ((d2 == 0) & within(qx1, qy1, qx2, qy2, px2, py2)) |
+                    ((d3 == 0) & within(px1, py1, px2, py2, qx1, qy1)) |
+                    ((d4 == 0) & within(px1, py1, px2, py2, qx2, qy2)))
+        return found[crossing | touching]
+
+    def count_intersections(self, segment):
+        """Number of segments of the set that intersect segment."""
+        return len(self.intersects(segment))
+
+    def intersections(self):
+        """
+        All intersections between segments of the set, with the
+        Bentley-Ottmann sweep in O((m + k) log m) for k intersection points.
+
+        A vertical line sweeps from left to right (bottom to top along a
+        vertical line) and stops at every endpoint and every intersection
+        point. The segments cut by the line are kept in order from bottom to
+        top, and only segments that become neighbours in that order are
+        intersected to find the next stops. All decisions are exact: the
+        orientation signs come from predicates.py and intersection points
+        are computed with rational arithmetic. Every point where segments
+        meet is reported once, with all the segments through it; segments
+        that overlap along a line meet at the endpoints of the overlap.
+
+        Returns list of ((x, y), indices) with indices the sorted segment
+        indices through the point (x, y), in sweep order
+        """
+        ends = []
+        for x1, y1, x2, y2 in self.segments.tolist():
+            ends.append(((x1, y1), (x2, y2)) if (x1, y1) <= (x2, y2) else ((x2, y2), (x1, y1)))
+
+        starts = {}
+        for i, (start, end) in enumerate(ends):
+            starts.setdefault(start, []).append(i)
+            starts.setdefault(end, [])
+        events = list(starts)
+        heapq.heapify(events)
+        queued = set(events)
+
+        def slope(i):
+            (x1, y1), (x2, y2) = ends[i]
+            if x1 == x2:
+                return 1, 0
+            return 0, (Fraction(y2) - Fraction(y1)) / (Fraction(x2) - Fraction(x1))
+
+        def schedule(i, j, p):
+            """Queue the point where segments i and j cross, if it is after p."""
+            a, b = ends[i]
+            c, d = ends[j]
+            d1, d2 = orient2d(a, b, c), orient2d(a, b, d)
+            d3, d4 = orient2d(c, d, a), orient2d(c, d, b)
+            if (d1 > 0 and d2 > 0) or (d1 < 0 and d2 < 0) or \
+                    (d3 > 0 and d4 > 0) or (d3 < 0 and d4 < 0) or (d1 == 0 and d2 == 0):
+                # Apart, or on one line, where they meet at endpoints
+                return
+            ax, ay, bx, by = map(Fraction, (a[0], a[1], b[0], b[1]))
+            cx, cy, dx, dy = map(Fraction, (c[0], c[1], d[0], d[1]))
+            t = (((cx - ax) * (dy - cy) - (cy - ay) * (dx - cx)) /
+                 ((bx - ax) * (dy - cy) - (by - ay) * (dx - cx)))
+            q = (ax + t * (bx - ax), ay + t * (by - ay))
+            if q > p and q not in queued:
+                queued.add(q)
+                heapq.heappush(events, q)
+
+        status = []
+        result = []
+        while events:
+            p = heapq.heappop(events)
+
+            # The segments through p are consecutive in the status: those
+            # below p come first, those above it last
+            lo, hi = 0, len(status)
+            while lo < hi:
+                middle = (lo + hi) // 2
+                a, b = ends[status[middle]]
+                if _orient(a, b, p) > 0:
+                    lo = middle + 1
+                else:
+                    hi = middle
+            hi = lo
+            while hi < len(status) and _orient(*ends[status[hi]], p) == 0:
+                hi += 1
+
+            through = status[lo:hi] + starts.get(p, [])
+            if len(through) > 1:
+                result.append(((float(p[0]), float(p[1])), sorted(through)))
+
+            # Segments that go on after p, ordered by slope just right of p
+            going_on = sorted((i for i in through if ends[i][1] != p), key=slope)
+            status[lo:hi] = going_on
+            if going_on:
+                if lo > 0:
+                    schedule(status[lo - 1], status[lo], p)
+                top = lo + len(going_on)
+                if top < len(status):
+                    schedule(status[top - 1], status[top], p)
+            elif 0 < lo < len(status):
+                schedule(status[lo - 1], status[lo], p)
+        return result
+
+    def intersection_counts(self):
+        """
+        Number of other segments of the set that each segment intersects,
+        from one run of intersections.
+
+        Returns int array of shape (m,)
+        """
+        pairs = set()
+        for _, through in self.intersections():
+            for k, i in enumerate(through):
+                for j in through[k + 1:]:
+                    pairs.add((i, j))
+        counts = np.zeros(len(self.segments), dtype=np.intp)
+        for i, j in pairs:
+            counts[i] += 1
+            counts[j] += 1
+        return counts
@@ -0,0 +1,100 @@
+class SiteIndex:
+    """
+    k-d tree over the coordinates of sites (anything with x and y).
+
+    Every node splits its sites at the median of the coordinate with the
+    larger spread, so the tree stays balanced however the sites are
+    clustered; airports crowd around cities and leave large empty regions.
+    Each node keeps the bounding box of its sites, and a query skips every
+    node whose box is too far away. All comparisons use squared distances.
+    """
+    # Largest number of sites in a leaf
+    LEAF_SIZE = 8
+
+    def __init__(self, sites):
+        """
+        Parameters:
+        sites (list): Objects with x and y attributes, e.g. VoronoiSite
+        """
+        self.sites = list(sites)
+        self._xy = [(site.x, site.y) for site in self.sites]
+        self._root = self._build(list(range(len(self.sites)))) if self.sites else None
+
+    def _build(self, indices):
+        """
+        Node for the sites at indices: (box, axis, split, low, high) with
+        low and high the child nodes, or (box, None, None, indices, None)
+        for a leaf. box is (min x, min y, max x, max y).
+        """
+        xs = [self._xy[i][0] for i in indices]
+        ys = [self._xy[i][1] for i in indices]
+        box = (min(xs), min(ys), max(xs), max(ys))
+        if len(indices) <= self.LEAF_SIZE or (box[0] == box[2] and box[1] == box[3]):
+            return box, None, None, indices, None
+        axis = 0 if box[2] - box[0] >= box[3] - box[1] else 1
+        indices.sort(key=lambda i: self._xy[i][axis])
+        middle = len(indices) // 2
+        split = self._xy[indices[middle]][axis]
+        return (box, axis, split,
+                self._build(indices[:middle]), self._build(indices[middle:]))
+
+    @staticmethod
+    def _box_distance(box, x, y):
+        """Squared distance from (x, y) to the nearest point of a box."""
+        dx = max(box[0] - x, 0, x - box[2])
+        dy = max(box[1] - y, 0, y - box[3])
+        return dx * dx + dy * dy
+
+    def within(self, center, radius):
+        """
+        Yield the sites strictly closer than radius to center, nearest
+        subtrees first; stop early by breaking out of the loop.
+        """
+        if self._root is None:
+            return
+        x, y = center[0], center[1]
+        limit = radius * radius
+        stack = [self._root]
+        while stack:
+            box, axis, split, low, high = stack.pop()
+            if self._box_distance(box, x, y) >= limit:
+                continue
+            if axis is None:
+                for i in low:
+                    sx, sy = self._xy[i]
+                    if (sx - x) ** 2 + (sy - y) ** 2 < limit:
+                        yield self.sites[i]
+            elif (x if axis == 0 else y) < split:
+                stack.extend((high, low))
+            else:
+                stack.extend((low, high))
+
+    def nearest_two(self, point):
+        """
+        The two sites nearest to point.
+
+        Returns list of up to two (squared distance, site) pairs, nearest first
+        """
+        if self._root is None:
+            return []
+        x, y = point[0], point[1]
+        best = []  # up to two (squared distance, index), sorted
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            box, axis, split, low, high = node
+            if len(best) == 2 and self._box_distance(box, x, y) > best[1][0]:
+                continue
+            if axis is None:
+                for i in low:
+                    sx, sy = self._xy[i]
+                    d = (sx - x) ** 2 + (sy - y) ** 2
+                    if len(best) < 2 or d < best[1][0]:
+                        best.append((d, i))
+                        best.sort()
+                        del best[2:]
+            elif (x if axis == 0 else y) < split:
+                stack.extend((high, low))
+            else:
+                stack.extend((low, high))
+        return [(d, self.sites[i]) for d, i in best]
@@ -1,7 +1,17 @@
+import os
+import sys
+import itertools
 import math
 import matplotlib.pyplot as plt
 from matplotlib import collections as mc
-from shapely.geometry import LineString
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d, incircle
+from delaunay import DelaunayTriangulation
+from site_index import SiteIndex
+from segment_set import SegmentSet
+
+# Relative difference below which two squared distances count as equal
+DISTANCE_TOLERANCE = 1e-9
 
 
 class VoronoiSite:
@@ -22,6 +32,11 @@ def in_boundaries(this_point):
     return False
 
 
+def same_distance(d1, d2):
+    """True if two squared distances are equal up to rounding errors."""
+    return abs(d1 - d2) <= DISTANCE_TOLERANCE * max(d1, d2)
+
+
 def distance(site, point):
     if type(site) == type(point):
         d = math.sqrt((site.x - point.x) ** 2 + (site.y - point.y) ** 2)
@@ -76,42 +91,61 @@ def find_center(point1, point2, point3):
     return center
 
 
-def points_in_circle(center, radius, sites_table):
-    flag = False
-    for site in sites_table:
-        d = distance(site, center)
+def points_in_circle(center, radius, index):
+    """
+    True if a site of the SiteIndex lies strictly inside the circle. Only the
+    sites near the circle are visited.
+    """
+    return next(index.within(center, radius), None) is not None
 
-        if round(d, 5) < round(radius, 5):
-            flag = True
-    return flag
+
+def sites_in_circumcircle(site1, site2, site3, sites_table):
+    # Exact in-circle test against the circle through the three sites,
+    # no rounding of the center or the radius involved
+    a, b, c = (site1.x, site1.y), (site2.x, site2.y), (site3.x, site3.y)
+    orientation = orient2d(a, b, c)
+    if orientation == 0:
+        # Collinear sites have no circumcircle
+        return True
+    for site in sites_table:
+        # incircle is positive inside for counter-clockwise a, b, c
+        side = incircle(a, b, c, (site.x, site.y))
+        if side != 0 and (side > 0) == (orientation > 0):
+            return True
+    return False
 
 
-def is_vector_perpendicular(this_vector, this_site, sites_table):
+def is_vector_perpendicular(this_vector, this_site, index):
+    """
+    True if the midpoint of the vector is equally far from this_site and
+    another site of the SiteIndex, with no site closer; the vector then lies
+    on the perpendicular bisector between the two, on the edge of
+    this_site's cell. Only the sites near the midpoint are visited.
+    """
     x = (this_vector[0][0] + this_vector[1][0]) / 2
     y = (this_vector[0][1] + this_vector[1][1]) / 2
-    m = [x, y]
-    d1 = distance(this_site, m)
+    d1 = (this_site.x - x) ** 2 + (this_site.y - y) ** 2
 
-    for site in sites_table:
-        if site != this_site:
-            d2 = distance(site, m)
-            if round(d1, 10) == round(d2, 10):
-                return True
-    return False
+    nearest = index.nearest_two([x, y])
+    if len(nearest) < 2 or not same_distance(nearest[0][0], d1):
+        return False
+    other = nearest[1][0] if nearest[0][1] is this_site else nearest[0][0]
+    return same_distance(other, d1)
 
 
-def number_of_intersections(line, line_table):
-    count = 0
-    e1 = LineString([line[0], line[1]])
-    for l in line_table:
-        e2 = LineString([l[0], l[1]])
-        if e1.intersects(e2):
-            count += 1
+def number_of_intersections(line, line_table, segments=None):
+    """
+    Number of vectors of line_table that the line intersects, touching
+    included. Only the vectors near the line are tested when a SegmentSet of
+    line_table is given.
+    """
+    if segments is None:
+        segments = SegmentSet(line_table)
+    return segments.count_intersections(line)
 
-    return count
 
-
-def find_voronoi_points(sites_table):
+def find_voronoi_points_brute_force(sites_table):
+    index = SiteIndex(sites_table)
     for this_site in sites_table:
         sites_tested = [this_site]
 
@@ -129,9 +163,7 @@ def find_voronoi_points(sites_table):
                         if cur_center is not None:
                             cur_center = [round(cur_center[0], 12), round(cur_center[1], 12)]
 
-                            radius = distance(this_site, cur_center)
-
-                            if not points_in_circle(cur_center, radius, sites_table):
+                            if not sites_in_circumcircle(this_site, site1, site2, sites_table):
 
                                 #if cur_center not in this_site.voronoi_points:
                                 this_site.voronoi_points.append(cur_center)
@@ -148,16 +180,16 @@ def find_voronoi_points(sites_table):
                             c = [this_site.x, this_site.y]
 
                             if d1 < d2:
-                                if not points_in_circle(c, d1 / 2, sites_table):
+                                if not points_in_circle(c, d1 / 2, index):
                                     if perpendicular1 not in this_site.perpendiculars:
                                         this_site.perpendiculars.append(perpendicular1)
                             elif d2 < d1:
-                                if not points_in_circle(c, d2 / 2, sites_table):
+                                if not points_in_circle(c, d2 / 2, index):
                                     if perpendicular2 not in this_site.perpendiculars:
                                         this_site.perpendiculars.append(perpendicular2)
 
                             elif d1 == d2:
-                                if not points_in_circle(c, d2 / 2, sites_table):
+                                if not points_in_circle(c, d2 / 2, index):
 
                                     if perpendicular1 not in this_site.perpendiculars:
                                         this_site.perpendiculars.append(perpendicular1)
@@ -166,7 +198,53 @@ def find_voronoi_points(sites_table):
                                         this_site.perpendiculars.append(perpendicular2)
 
 
+def find_voronoi_points(sites_table):
+    """
+    Fill voronoi_points and perpendiculars of every site from the Delaunay
+    triangulation, in O(n log n) instead of testing every triple of sites.
+
+    The Voronoi vertices are the centres of the empty circles through three
+    sites, which are exactly the circumcircles of the Delaunay triangles.
+    When more than three sites lie on one empty circle, every triple of them
+    counts, as in find_voronoi_points_brute_force. Each site gets the same
+    points and perpendiculars in the same order as from the brute force
+    version: the triples are visited in the order of the sites table, and
+    triples whose centre cannot be computed are skipped.
+    """
+    locations = [(site.x, site.y) for site in sites_table]
+    copies = {}
+    for i, location in enumerate(locations):
+        copies.setdefault(location, []).append(i)
+
+    # The other two sites of every empty circle through each site
+    pairs = [[] for _ in sites_table]
+    for circle in DelaunayTriangulation(locations).empty_circles():
+        members = sorted(i for v in circle for i in copies[locations[v]])
+        for i, j, k in itertools.combinations(members, 3):
+            if len({locations[i], locations[j], locations[k]}) < 3:
+                continue  # two copies of one site are on a line with any third
+            pairs[i].append((j, k))
+            pairs[j].append((i, k))
+            pairs[k].append((i, j))
+
+    for this_site, site_pairs in zip(sites_table, pairs):
+        for first, second in sorted(site_pairs):
+            site1, site2 = sites_table[first], sites_table[second]
+            cur_center = find_center(this_site, site1, site2)
+            if cur_center is None:
+                continue
+            this_site.voronoi_points.append([round(cur_center[0], 12), round(cur_center[1], 12)])
+
+            perpendicular1 = perpendicular(this_site, site1)
+            perpendicular2 = perpendicular(this_site, site2)
+            if perpendicular1 not in this_site.perpendiculars:
+                this_site.perpendiculars.append(perpendicular1)
+            if perpendicular2 not in this_site.perpendiculars:
+                this_site.perpendiculars.append(perpendicular2)
+
+
 def find_voronoi_cells(sites_table):
+    index = SiteIndex(sites_table)
     for this_site in sites_table:
         points_checked = []
 
@@ -180,7 +258,7 @@ def find_voronoi_cells(sites_table):
                     rev_vector = [voronoi_point2, voronoi_point1]
 
                     if vector not in this_site.vectors and rev_vector not in this_site.vectors:
-                        if is_vector_perpendicular(vector, this_site, sites_table):
+                        if is_vector_perpendicular(vector, this_site, index):
                             this_site.vectors.append(vector)
 
         for point in this_site.voronoi_points:
@@ -193,6 +271,7 @@ def find_voronoi_cells(sites_table):
 
 
 def find_voronoi_semi_lines(sites_table):
+    segments = SegmentSet(all_vectors)
     for this_site in sites_table:
         if not this_site.has_cell:
 
@@ -209,7 +288,7 @@ def find_voronoi_semi_lines(sites_table):
                                 other_point = intersection(p, b)
                                 if other_point is not None:
                                     semi_line = [point, other_point]
-                                    if number_of_intersections(semi_line, all_vectors) <= 2:
+                                    if number_of_intersections(semi_line, all_vectors, segments) <= 2:
                                         this_site.semi_lines.append(semi_line)
 
 
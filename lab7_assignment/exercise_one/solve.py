@@ -1,8 +1,13 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon
 from matplotlib.animation import FuncAnimation, PillowWriter
 from typing import List, Tuple
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from predicates import orient2d
+from simple_polygon import check_simple
 
 class ArtGalleryProblem:
     def __init__(self, polygon_vertices: List[Tuple[float, float]], vertex_names=None):
@@ -57,12 +62,11 @@ class ArtGalleryProblem:
     
     def point_in_triangle(self, p, a, b, c):
         """Check if point p is inside triangle abc."""
-        def sign(p1, p2, p3):
-            return (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p2[0] - p3[0]) * (p1[1] - p3[1])
-        
-        d1 = sign(p, a, b)
-        d2 = sign(p, b, c)
-        d3 = sign(p, c, a)
+        # Exact signs, so vertices on an edge of the triangle are not
+        # misclassified by rounding
+        d1 = orient2d(p, a, b)
+        d2 = orient2d(p, b, c)
+        d3 = orient2d(p, c, a)
         
         has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
         has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
@@ -71,6 +75,9 @@ class ArtGalleryProblem:
 
     def ear_clipping_triangulation(self):
         """Triangulate polygon using ear clipping method."""
+        # A self-intersecting polygon has no ear to clip at some point;
+        # reject it up front with the offending edges
+        check_simple(self.vertices, self.vertex_names)
         vertices = self.vertices.tolist()
         triangles = []
         
@@ -298,15 +305,6 @@ polygon = [
     (-70, -40)   # D'
 ]
 
-polygon = [
-    (0,5),   # P1
-    (3,-2),   # P2
-    (-1,-2),   # P3
-    (3,0),   # P4
-    (1,2),    # P5
-    (3,2),   # P6
-]
-
 vertex_names = ['D', 'B', "A'", "C'", 'E', 'F', "F'", "E'", 'C', 'A', "B'", "D'"]
 
 art_gallery = ArtGalleryProblem(polygon, vertex_names)